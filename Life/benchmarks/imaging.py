@@ -0,0 +1,267 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+"""
+Benchmarks every entry in `utilities.imaging.image_operations` against a fixed corpus of generated images.
+
+Run from the `Life` directory:
+
+    python -m benchmarks.imaging
+    python -m benchmarks.imaging --operations blur flip --fixtures gif_256_10 --repeat 3
+    python -m benchmarks.imaging --save
+
+Each run happens in a freshly spawned process, the same way `Imaging.edit_image` runs them, so peak RSS is per operation. Results are compared against the stored
+baseline and the exit code is 1 if anything regressed by more than `--threshold`.
+"""
+
+import argparse
+import json
+import multiprocessing
+import os
+import resource
+import statistics
+import sys
+import time
+import typing
+
+from wand.image import Image
+
+from utilities import imaging
+
+
+BASELINE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'imaging_baseline.json')
+
+# name: (format, width, height, frames)
+FIXTURES = {
+    'png_256':     ('png', 256, 256, 1),
+    'png_1024':    ('png', 1024, 1024, 1),
+    'png_2048':    ('png', 2048, 2048, 1),
+    'jpeg_256':    ('jpeg', 256, 256, 1),
+    'jpeg_1024':   ('jpeg', 1024, 1024, 1),
+    'jpeg_2048':   ('jpeg', 2048, 2048, 1),
+    'webp_512':    ('webp', 512, 512, 1),
+    'webp_1024':   ('webp', 1024, 1024, 1),
+    'gif_256_10':  ('gif', 256, 256, 10),
+    'gif_256_50':  ('gif', 256, 256, 50),
+    'gif_512_20':  ('gif', 512, 512, 20),
+}
+
+# Mirrors the default arguments of the commands in `cogs.images`.
+OPERATION_KWARGS = {
+    'blur':      {'amount': 2.0},
+    'edge':      {'radius': 3, 'sigma': 1.5},
+    'emboss':    {'radius': 3, 'sigma': 1},
+    'kuwahara':  {'radius': 2, 'sigma': 1.5},
+    'sharpen':   {'radius': 8, 'sigma': 4},
+    'spread':    {'radius': 2.0},
+    'noise':     {'method': 'uniform', 'attenuate': 0.5},
+    'blueshift': {'factor': 1.25},
+    'charcoal':  {'radius': 1.5, 'sigma': 0.5},
+    'colorize':  {'colour': '#FF0000'},
+    'implode':   {'amount': 0.4},
+    'polaroid':  {'angle': 0.0, 'caption': None},
+    'sepiatone': {'threshold': 0.8},
+    'solarize':  {'threshold': 0.5},
+    'swirl':     {'degree': 45},
+    'wave':      {},
+    'flip':      {},
+    'flop':      {},
+    'rotate':    {'degree': 45},
+    'floor':     {},
+}
+
+METRICS = ('wall', 'cpu', 'peak_rss')
+
+
+class Collector:
+
+    def __init__(self) -> None:
+        self.data = None
+
+    def send(self, data: typing.Any) -> None:
+        self.data = data
+
+
+def create_fixture(image_format: str, width: int, height: int, frames: int) -> bytes:
+
+    with Image() as image:
+
+        for frame in range(frames):
+            with Image(width=width, height=height, pseudo='gradient:#e74c3c-#2c3e50') as gradient:
+                with Image(width=width, height=height, pseudo='pattern:checkerboard') as pattern:
+                    gradient.composite_channel('default_channels', pattern, 'overlay', 0, 0)
+
+                gradient.modulate(hue=100 + (frame * 200 / frames))
+                image.sequence.append(gradient)
+
+        image.format = image_format
+        if image_format == 'gif':
+            for frame in image.sequence:
+                frame.delay = 5
+
+        return image.make_blob()
+
+
+def measure(operation: str, image_bytes: bytes, child_pipe: multiprocessing.Pipe) -> None:
+
+    rss_before = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+
+    collector = Collector()
+    wall_start, cpu_start = time.perf_counter(), time.process_time()
+    imaging.do_edit_image(imaging.image_operations[operation], image_bytes, collector, **OPERATION_KWARGS[operation])
+    wall, cpu = time.perf_counter() - wall_start, time.process_time() - cpu_start
+
+    # ru_maxrss is in kilobytes on linux and bytes on macOS.
+    scale = 1 if sys.platform == 'darwin' else 1024
+    peak_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss * scale
+
+    if not isinstance(collector.data, dict):
+        child_pipe.send({'error': repr(collector.data)})
+        return
+
+    child_pipe.send({
+        'wall': wall,
+        'cpu': cpu,
+        'peak_rss': peak_rss,
+        'rss_delta': peak_rss - (rss_before * scale),
+        'output_size': len(collector.data['image'].getvalue()),
+        'output_format': collector.data['format'],
+    })
+
+
+def run(operation: str, image_bytes: bytes) -> dict:
+
+    context = multiprocessing.get_context('spawn')
+    parent_pipe, child_pipe = context.Pipe()
+
+    start = time.perf_counter()
+    process = context.Process(target=measure, args=(operation, image_bytes, child_pipe), daemon=True)
+    process.start()
+
+    result = parent_pipe.recv()
+    process.join()
+    process.close()
+
+    result['process_wall'] = time.perf_counter() - start
+    return result
+
+
+def benchmark(operations: typing.List[str], fixtures: typing.List[str], repeat: int) -> typing.Dict[str, typing.Dict[str, dict]]:
+
+    results = {}
+
+    for fixture in fixtures:
+
+        image_format, width, height, frames = FIXTURES[fixture]
+        image_bytes = create_fixture(image_format, width, height, frames)
+
+        for operation in operations:
+
+            runs = [run(operation, image_bytes) for _ in range(repeat)]
+            if errors := [result['error'] for result in runs if 'error' in result]:
+                results.setdefault(operation, {})[fixture] = {'error': errors[0]}
+                print(format_row(operation, fixture, results[operation][fixture]), flush=True)
+                continue
+
+            result = {key: statistics.median(result[key] for result in runs) for key in (*METRICS, 'rss_delta', 'output_size', 'process_wall')}
+            result['output_format'] = runs[0]['output_format']
+            result['input_size'] = len(image_bytes)
+            result['cpu_per_megapixel_frame'] = result['cpu'] / ((width * height * frames) / 1_000_000)
+
+            results.setdefault(operation, {})[fixture] = result
+            print(format_row(operation, fixture, result), flush=True)
+
+    return results
+
+
+def format_row(operation: str, fixture: str, result: dict, regressions: typing.List[str] = None) -> str:
+
+    if 'error' in result:
+        return f'{operation:10} | {fixture:11} | {result["error"]}'
+
+    flags = f' | REGRESSED: {", ".join(regressions)}' if regressions else ''
+    return f'{operation:10} | {fixture:11} | {result["wall"]:8.3f}s | {result["cpu"]:8.3f}s | {result["peak_rss"] / 1048576:8.1f}MB | ' \
+           f'{result["output_size"] / 1024:9.1f}KB | {result["cpu_per_megapixel_frame"]:8.3f}s{flags}'
+
+
+def compare(results: dict, baseline: dict, threshold: float) -> typing.Dict[typing.Tuple[str, str], typing.List[str]]:
+
+    regressions = {}
+
+    for operation, fixtures in results.items():
+        for fixture, result in fixtures.items():
+
+            previous = baseline.get(operation, {}).get(fixture)
+            if not previous or 'error' in result or 'error' in previous:
+                continue
+
+            regressed = [
+                f'{metric} {previous[metric]:.3f} -> {result[metric]:.3f}' for metric in METRICS
+                if previous[metric] > 0 and (result[metric] - previous[metric]) / previous[metric] > threshold
+            ]
+            if regressed:
+                regressions[(operation, fixture)] = regressed
+
+    return regressions
+
+
+def main() -> int:
+
+    parser = argparse.ArgumentParser(description='Benchmark the image operations used by the image commands.')
+    parser.add_argument('--operations', nargs='+', choices=list(imaging.image_operations.keys()), default=list(imaging.image_operations.keys()))
+    parser.add_argument('--fixtures', nargs='+', choices=list(FIXTURES.keys()), default=list(FIXTURES.keys()))
+    parser.add_argument('--repeat', type=int, default=1, help='Runs per operation and fixture, the median is reported.')
+    parser.add_argument('--baseline', default=BASELINE_PATH, help='Path of the baseline file to compare against or save to.')
+    parser.add_argument('--threshold', type=float, default=0.25, help='Relative increase over the baseline that counts as a regression.')
+    parser.add_argument('--save', action='store_true', help='Save these results as the new baseline.')
+    args = parser.parse_args()
+
+    print(f'{"Operation":10} | {"Fixture":11} | {"Wall":>9} | {"CPU":>9} | {"Peak RSS":>10} | {"Output":>11} | CPU/MPf')
+    results = benchmark(operations=args.operations, fixtures=args.fixtures, repeat=args.repeat)
+
+    if args.save:
+
+        baseline = {}
+        if os.path.isfile(args.baseline):
+            with open(args.baseline, 'r') as file:
+                baseline = json.load(file)
+
+        for operation, fixtures in results.items():
+            baseline.setdefault(operation, {}).update(fixtures)
+
+        with open(args.baseline, 'w') as file:
+            json.dump(baseline, file, indent=4, sort_keys=True)
+
+        print(f'\nSaved baseline to \'{args.baseline}\'.')
+        return 0
+
+    if not os.path.isfile(args.baseline):
+        print(f'\nNo baseline found at \'{args.baseline}\', use --save to create one.')
+        return 0
+
+    with open(args.baseline, 'r') as file:
+        baseline = json.load(file)
+
+    regressions = compare(results=results, baseline=baseline, threshold=args.threshold)
+    if not regressions:
+        print(f'\nNo regressions over {args.threshold:.0%} against the baseline.')
+        return 0
+
+    print(f'\n{len(regressions)} regression(s) over {args.threshold:.0%} against the baseline:\n')
+    for (operation, fixture), regressed in regressions.items():
+        print(format_row(operation, fixture, results[operation][fixture], regressed))
+
+    return 1
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -24,7 +24,7 @@ from discord.ext import commands
 
 from config import config
 from managers import guild_manager, user_manager
-from utilities import context, help, objects, utils
+from utilities import context, help, objects, paginators, utils
 
 log = logging.getLogger(__name__)
 
@@ -47,6 +47,7 @@ class Life(commands.AutoShardedBot):
         self.session = aiohttp.ClientSession(loop=self.loop)
         self.config = config.Config(bot=self)
         self.utils = utils.Utils(bot=self)
+        self.paginators = paginators.PaginatorRegistry(bot=self)
 
         self.guild_manager = guild_manager.GuildConfigManager(bot=self)
         self.user_manager = user_manager.UserConfigManager(bot=self)
@@ -64,7 +65,7 @@ class Life(commands.AutoShardedBot):
         self.support = f'https://discord.gg/xP8xsHr'
 
         self.commands_not_allowed_dms = {
-            'join', 'play', 'leave', 'skip', 'pause', 'unpause', 'seek', 'volume', 'now_playing', 'queue', 'queue sort', 'queue remove', 'queue history', 'queue history clear',
+            'join', 'play', 'leave', 'skip', 'pause', 'unpause', 'seek', 'volume', 'now_playing', 'queue', 'queue sort', 'queue sort off', 'queue remove', 'queue history', 'queue history clear',
             'queue history detailed', 'queue shuffle', 'queue clear', 'queue move', 'queue history reverse', 'queue detailed', 'queue loop',
 
             'icon', 'banner', 'splash', 'server', 'channels', 'member',
@@ -78,7 +79,7 @@ class Life(commands.AutoShardedBot):
 
         self.first_ready = True
 
-        self.error_formatter = None
+        self.error_reporter = None
         self.mystbin = None
         self.imaging = None
         self.ksoft = None
@@ -192,10 +193,17 @@ class Life(commands.AutoShardedBot):
         log.info('[BOT] Closing bot down.')
         print('\n[BOT] Closing bot down.')
 
+        self.user_manager.remind_manager.close()
+
         log.info('[BOT] Closing database connection.')
         print('[DB] Closing database connection.')
         await self.db.close()
 
+        if self.imaging is not None:
+            log.info('[BOT] Closing media uploader.')
+            print('[MEDIA] Closing media uploader.')
+            await self.imaging.uploader.close()
+
         log.info('[BOT] Closing aiohttp client session.')
         print('[CS] Closing aiohttp client session.')
         await self.session.close()
@@ -105,20 +105,7 @@ class Birthdays(commands.Cog):
         Displays a list of upcoming birthdays within the server.
         """
 
-        configs = sorted(self.bot.user_manager.configs.items(), key=lambda user_config: user_config[1].birthday)
-        birthdays = {}
-
-        for user_id, config in configs:
-
-            member = ctx.guild.get_member(user_id)
-            if not member:
-                continue
-
-            if config.birthday_private or config.birthday == pendulum.DateTime(2020, 1, 1, 0, 0, 0, tzinfo=pendulum.timezone('UTC')):
-                continue
-
-            birthdays[member] = config
-
+        birthdays = self.bot.user_manager.upcoming_birthdays(guild=ctx.guild, limit=5)
         if not birthdays:
             raise exceptions.ArgumentError('There are no users who have set their birthday in this server, or everyone has them private.')
 
@@ -127,7 +114,7 @@ class Birthdays(commands.Cog):
             f'`Birthday:` {self.bot.utils.format_date(datetime=user_config.birthday)}\n'
             f'`Next birthday:` In {self.bot.utils.format_difference(datetime=user_config.next_birthday.subtract(days=1), suppress=[])}\n'
             f'`Current age:` {user_config.age}'
-            for person, user_config in list(birthdays.items())[:5]
+            for person, user_config in birthdays
         )
 
         embed = discord.Embed(description=f'**Upcoming birthdays:**\n\n{birthdays_format}', colour=ctx.colour)
@@ -139,24 +126,11 @@ class Birthdays(commands.Cog):
         Displays the next person to have a birthday within the server.
         """
 
-        configs = sorted(self.bot.user_manager.configs.items(), key=lambda user_config: user_config[1].birthday)
-        birthdays = {}
-
-        for user_id, config in configs:
-
-            member = ctx.guild.get_member(user_id)
-            if not member:
-                continue
-
-            if config.birthday_private or config.birthday == pendulum.DateTime(2020, 1, 1, 0, 0, 0, tzinfo=pendulum.timezone('UTC')):
-                continue
-
-            birthdays[member] = config
-
+        birthdays = self.bot.user_manager.upcoming_birthdays(guild=ctx.guild, limit=1)
         if not birthdays:
             raise exceptions.ArgumentError('There are no users who have set their birthday in this server, or everyone has them private.')
 
-        birthday = list(birthdays.items())[0]
+        birthday = birthdays[0]
 
         embed = discord.Embed(description=f'**The next person to have a birthday is:**\n\n'
                                           f'__**`{birthday[0].name}`:**__\n'
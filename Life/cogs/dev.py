@@ -133,6 +133,27 @@ class Dev(commands.Cog):
         embed = discord.Embed(title=f'{self.bot.user.name} socket stats.', colour=ctx.colour, description='\n'.join(description))
         await ctx.send(embed=embed)
 
+    @commands.is_owner()
+    @dev.command(name='media', hidden=True)
+    async def dev_media(self, ctx: context.Context) -> None:
+        """
+        Displays upload stats for each media backend since startup.
+        """
+
+        if not self.bot.imaging or not (stats := self.bot.imaging.uploader.stats()):
+            raise exceptions.ArgumentError('There have been no media uploads since startup.')
+
+        description = [f'```py\nBackend      | Uploads | Failures | Retries | Average  | Max      | Size']
+
+        for backend, metrics in stats.items():
+            description.append(f'{backend:12} | {metrics.uploads:<7} | {metrics.failures:<8} | {metrics.retries:<7} | {metrics.average_time:<7.3f}s | {metrics.max_time:<7.3f}s | '
+                               f'{humanize.naturalsize(metrics.bytes)}')
+
+        description.append(f'\n{self.bot.imaging.uploader.queue.qsize()} upload(s) waiting in the queue.```')
+
+        embed = discord.Embed(title=f'{self.bot.user.name} media stats.', colour=ctx.colour, description='\n'.join(description))
+        await ctx.send(embed=embed)
+
     @dev.group(name='blacklist', aliases=['bl'], hidden=True, invoke_without_command=True)
     async def dev_blacklist(self, ctx: context.Context) -> None:
         """
@@ -16,13 +16,12 @@ import typing
 import discord
 import mystbin
 import pendulum
-import prettify_exceptions
 import slate
 from discord.ext import commands
 from discord.ext.alternatives.literal_converter import BadLiteralArgument
 
 from bot import Life
-from utilities import context, exceptions
+from utilities import context, errors, exceptions
 
 log = logging.getLogger(__name__)
 
@@ -32,8 +31,11 @@ class Events(commands.Cog):
     def __init__(self, bot: Life) -> None:
         self.bot = bot
 
-        self.bot.error_formatter = prettify_exceptions.DefaultFormatter()
         self.bot.mystbin = mystbin.Client()
+        self.bot.error_reporter = errors.ErrorReporter(bot=self.bot)
+
+    def cog_unload(self) -> None:
+        self.bot.error_reporter.close()
 
     @commands.Cog.listener()
     async def on_ready(self) -> None:
@@ -235,39 +237,7 @@ class Events(commands.Cog):
     async def handle_traceback(self, *, ctx: context.Context, error) -> None:
 
         await ctx.send(f'Something went wrong while executing that command. Please use `{self.bot.config.prefix}support` for more help or information.')
-
-        self.bot.error_formatter.theme['_ansi_enabled'] = True
-        print(f'\n{"".join(self.bot.error_formatter.format_exception(type(error), error, error.__traceback__)).strip()}\n')
-
-        avatar_url = str(ctx.author.avatar_url_as(format='gif' if ctx.author.is_avatar_animated() else 'png'))
-
-        info = f'Error in command `{ctx.command}`\n\n' \
-               f'{f"`Guild:` {ctx.guild} `{ctx.guild.id}`" if ctx.guild else ""}\n' \
-               f'`Channel:` {ctx.channel} `{ctx.channel.id}`\n' \
-               f'`Author:` {ctx.author} `{ctx.author.id}`\n' \
-               f'`Time:` {self.bot.utils.format_datetime(datetime=pendulum.now(tz="UTC"))}'
-
-        embed = discord.Embed(colour=ctx.colour, description=f'{ctx.message.content}')
-        embed.add_field(name='Info:', value=info)
-
-        await self.bot.errors_webhook.send(embed=embed, username=f'{ctx.author}', avatar_url=avatar_url)
-
-        self.bot.error_formatter.theme['_ansi_enabled'] = False
-        traceback = "".join(self.bot.error_formatter.format_exception(type(error), error, error.__traceback__)).strip()
-
-        log.error(f'[COMMANDS]\n\n{traceback}\n\n')
-
-        if len(traceback) < 2000:
-            traceback = f'```py\n{traceback}\n```'
-
-        else:
-            try:
-                traceback = await self.bot.mystbin.post(traceback, syntax='python')
-            except mystbin.APIError as error:
-                log.warning(f'[ERRORS] Error while uploading error traceback to mystbin | Code: {error.status_code} | Message: {error.message}')
-                print(f'[ERRORS] Error while uploading error traceback to mystbin | Code: {error.status_code} | Message: {error.message}')
-
-        await self.bot.errors_webhook.send(content=f'{traceback}', username=f'{ctx.author}', avatar_url=avatar_url)
+        self.bot.error_reporter.report(ctx=ctx, error=error)
 
 
 def setup(bot: Life):
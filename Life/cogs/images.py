@@ -24,7 +24,11 @@ class Images(commands.Cog):
     def __init__(self, bot: Life):
         self.bot = bot
 
-        self.bot.imaging = imaging.Imaging(self.bot)
+        if self.bot.imaging is None:
+            self.bot.imaging = imaging.Imaging(self.bot)
+
+    async def load(self) -> None:
+        await self.bot.imaging.uploader.start()
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -44,8 +48,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Sigma must be between `0` and `30`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='edge', radius=radius, sigma=sigma)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='edge', radius=radius, sigma=sigma)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -62,8 +66,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Amount must be between `0.0` and `50.0`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='blur', amount=amount)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='blur', amount=amount)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -83,8 +87,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Sigma must be between `0` and `30`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='emboss', radius=radius, sigma=sigma)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='emboss', radius=radius, sigma=sigma)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -105,8 +109,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Sigma must be between `0` and `20`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='kuwahara', radius=radius, sigma=sigma)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='kuwahara', radius=radius, sigma=sigma)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -127,8 +131,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Sigma must be between `0` and `50`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='sharpen', radius=radius, sigma=sigma)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='sharpen', radius=radius, sigma=sigma)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -145,8 +149,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Radius must be between `0` and `50`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='spread', radius=radius)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='spread', radius=radius)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -167,8 +171,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Attenuate must be between `0.0` and `1.0`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='noise', method=method, attenuate=attenuate)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='noise', method=method, attenuate=attenuate)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -185,8 +189,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Factor must be be between `0` and `20`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='blueshift', factor=factor)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='blueshift', factor=factor)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -207,8 +211,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Sigma must be between `-5.0` and `5.0`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='charcoal', radius=radius, sigma=sigma)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='charcoal', radius=radius, sigma=sigma)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -225,8 +229,8 @@ class Images(commands.Cog):
             colour = '#%02X%02X%02X' % (random.randint(0, 255), random.randint(0, 255), random.randint(0, 255))
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='colorize', colour=str(colour))
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='colorize', colour=str(colour))
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -243,8 +247,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Amount must be between `-20` and `20`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='implode', amount=amount)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='implode', amount=amount)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -265,8 +269,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Caption must be `100` characters or less.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='polaroid', angle=angle, caption=caption)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='polaroid', angle=angle, caption=caption)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -283,8 +287,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Threshold must be between `0.0` and `1.0`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='sepiatone', threshold=threshold)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='sepiatone', threshold=threshold)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -301,8 +305,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Threshold must be between `0.0` and `1.0`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='solarize', threshold=threshold)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='solarize', threshold=threshold)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -319,8 +323,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Degree must be between `-360` and `360`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='swirl', degree=degree)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='swirl', degree=degree)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -333,8 +337,8 @@ class Images(commands.Cog):
         """
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='wave')
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='wave')
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -347,8 +351,8 @@ class Images(commands.Cog):
         """
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='flip')
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='flip')
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -361,8 +365,8 @@ class Images(commands.Cog):
         """
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='flop')
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='flop')
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -379,8 +383,8 @@ class Images(commands.Cog):
             raise exceptions.ArgumentError('Degree must be between `-360` and `360`.')
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='rotate', degree=degree)
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='rotate', degree=degree)
+            await ctx.send(embed=embed, file=file)
 
     @commands.cooldown(1, 10, commands.cooldowns.BucketType.user)
     @commands.max_concurrency(1, per=commands.cooldowns.BucketType.guild)
@@ -393,8 +397,8 @@ class Images(commands.Cog):
         """
 
         async with ctx.channel.typing():
-            embed = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='floor')
-            await ctx.send(embed=embed)
+            embed, file = await self.bot.imaging.edit_image(ctx=ctx, url=image, edit_type='floor')
+            await ctx.send(embed=embed, file=file)
 
 
 def setup(bot: Life):
@@ -258,11 +258,18 @@ class Information(commands.Cog):
         Displays a list of roles and how many people have that role.
         """
 
-        counts = {role.name.title(): len(role.members) for role in ctx.guild.roles}
-        counts['Bots (Actual)'] = len([member for member in ctx.guild.members if member.bot])
+        role_counts = collections.Counter()
+        bots = 0
 
-        roles = [f'{role_name[:20] + (role_name[20:] and ".."):23} | {role_count}' for role_name, role_count in sorted(counts.items(), key=lambda kv: kv[1], reverse=True)]
-        await ctx.paginate(entries=roles, per_page=20, codeblock=True)
+        for member in ctx.guild.members:
+            role_counts.update(member.roles)
+            bots += member.bot
+
+        counts = {role.name.title(): role_counts[role] for role in ctx.guild.roles}
+        counts['Bots (Actual)'] = bots
+
+        roles = (f'{role_name[:20] + (role_name[20:] and ".."):23} | {role_count}' for role_name, role_count in sorted(counts.items(), key=lambda kv: kv[1], reverse=True))
+        await ctx.paginate(entries=roles, total_entries=len(counts), per_page=20, codeblock=True)
 
     @commands.command(name='channels')
     async def channels(self, ctx: context.Context, *, guild: guild_converter.Guild = None) -> None:
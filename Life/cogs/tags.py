@@ -10,6 +10,8 @@
 #  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
 #
 
+import typing
+
 import discord
 import pendulum
 from discord.ext import commands
@@ -252,12 +254,15 @@ class Tags(commands.Cog):
         Get a list of all tags in this server.
         """
 
-        tags = await self.bot.db.fetch('SELECT * FROM tags WHERE guild_id = $1', ctx.guild.id)
-        if not tags:
+        total = await self.bot.db.fetchval('SELECT count(*) FROM tags WHERE guild_id = $1', ctx.guild.id)
+        if not total:
             raise exceptions.ArgumentError(f'There are no tags in this server.')
 
-        entries = [f'`{index + 1}.` {tag["name"]}' for index, tag in enumerate(tags)]
-        await ctx.paginate_embed(entries=entries, per_page=25, header=f'**{ctx.guild}\'s tags:**\n\n')
+        async def page_fetcher(page: int) -> typing.List[str]:
+            tags = await self.bot.db.fetch('SELECT name FROM tags WHERE guild_id = $1 ORDER BY name LIMIT 25 OFFSET $2', ctx.guild.id, page * 25)
+            return [f'`{index + 1}.` {tag["name"]}' for index, tag in enumerate(tags, start=page * 25)]
+
+        await ctx.paginate_embed(page_fetcher=page_fetcher, total_entries=total, per_page=25, header=f'**{ctx.guild}\'s tags:**\n\n')
 
     @tag.command(name='info')
     async def tag_info(self, ctx: context.Context, *, name: converters.TagConverter) -> None:
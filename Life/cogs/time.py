@@ -151,14 +151,13 @@ class Time(commands.Cog):
         Displays a list of your reminders.
         """
 
-        reminders = [reminder for reminder in ctx.user_config.reminders if not reminder.done]
-
+        reminders = await self.bot.user_manager.remind_manager.get_reminders(user_id=ctx.author.id)
         if not reminders:
             raise exceptions.GeneralError('You do not have any active reminders.')
 
         embed = discord.Embed(colour=ctx.colour, description=f'**Reminders for** `{ctx.author}:`\n\n')
 
-        for reminder in sorted(reminders, key=lambda reminder: reminder.datetime):
+        for reminder in reminders:
 
             embed.description += f'`{reminder.id}`: **In {self.bot.utils.format_difference(datetime=reminder.datetime, suppress=[])}**\n' \
                                  f'`When:` {self.bot.utils.format_datetime(datetime=reminder.datetime, seconds=True)}\n' \
@@ -174,6 +173,7 @@ class Time(commands.Cog):
         `reminder_ids`: A list of reminders IDs to delete, separated by spaces.
         """
 
+        reminders = {reminder.id: reminder for reminder in await self.bot.user_manager.remind_manager.get_reminders(user_id=ctx.author.id)}
         reminder_ids_to_remove = []
 
         for reminder_id in reminder_ids.split(' '):
@@ -183,7 +183,7 @@ class Time(commands.Cog):
             except ValueError:
                 raise exceptions.ArgumentError(f'`{reminder_id}` is not a valid reminder id.')
 
-            reminder = await self.bot.user_manager.remind_manager.get_reminder(user_id=ctx.author.id, reminder_id=reminder_id)
+            reminder = reminders.get(reminder_id)
             if not reminder:
                 raise exceptions.ArgumentError(f'You do not have a reminder with the id `{reminder_id}`.')
 
@@ -192,8 +192,7 @@ class Time(commands.Cog):
 
             reminder_ids_to_remove.append(reminder.id)
 
-        for reminder_id in reminder_ids_to_remove:
-            await self.bot.user_manager.remind_manager.delete_reminder(user_id=ctx.author.id, reminder_id=reminder_id)
+        await self.bot.user_manager.remind_manager.delete_reminders(user_id=ctx.author.id, reminder_ids=reminder_ids_to_remove)
 
         s = "s" if len(reminder_ids_to_remove) > 1 else ""
         await ctx.send(f'Deleted {len(reminder_ids_to_remove)} reminder{s} with id{s} {", ".join(f"`{reminder_id}`" for reminder_id in reminder_ids_to_remove)}.')
@@ -0,0 +1,152 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import json
+import logging
+import re
+from typing import Any, Dict, List, Optional, Tuple
+
+import aredis
+import slate
+import yarl
+
+from cogs.voice.custom import objects
+from utilities import cache, context
+
+__log__ = logging.getLogger('slate.cache')
+
+SPOTIFY_URL_REGEX = re.compile(r'https?://open.spotify.com/(?P<type>album|playlist|track)/(?P<id>[a-zA-Z0-9]+)')
+YOUTUBE_HOSTS = {'youtube.com', 'm.youtube.com', 'music.youtube.com'}
+
+
+def track_data(track: slate.Track) -> Tuple[str, Dict[str, Any]]:
+
+    info = {
+        'title': track.title, 'author': track.author, 'length': track.length, 'identifier': getattr(track, 'identifier', None), 'uri': track.uri,
+        'isStream': track.is_stream, 'isSeekable': track.is_seekable, 'position': 0, 'thumbnail': track.thumbnail
+    }
+
+    return track.track_id, info
+
+
+class CachedSearch:
+
+    __slots__ = ('source', 'search_type', 'name', 'tracks', 'search_result')
+
+    def __init__(self, source: str, search_type: str, name: Optional[str], tracks: List[Tuple[str, Dict[str, Any]]], search_result: Any = None) -> None:
+
+        self.source = source
+        self.search_type = search_type
+        self.name = name
+        self.tracks = tracks
+
+        self.search_result = search_result
+
+    def __repr__(self) -> str:
+        return f'<life.CachedSearch source={self.source} search_type={self.search_type} name={self.name} tracks={len(self.tracks)}>'
+
+    @classmethod
+    def from_search(cls, search: objects.SearchResult) -> 'CachedSearch':
+        return cls(source=search.source, search_type=search.search_type, name=search.name, tracks=[track_data(track) for track in search.tracks],
+                   search_result=search.search_result)
+
+    def to_json(self) -> str:
+        return json.dumps({'source': self.source, 'search_type': self.search_type, 'name': self.name, 'tracks': self.tracks})
+
+    def bind(self, ctx: context.Context) -> objects.SearchResult:
+
+        tracks = [slate.Track(track_id=track_id, ctx=ctx, track_info=dict(info)) for track_id, info in self.tracks]
+        return objects.SearchResult(source=self.source, search_type=self.search_type, search_result=self.search_result, tracks=tracks, name=self.name)
+
+
+class SearchCache:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        self.cache = cache.TTLCache(max_size=self.bot.config.music['search_cache_size'], ttl=self.bot.config.music['search_cache_ttl'])
+        self.redis = self.bot.config.music['search_cache_redis']
+
+    @staticmethod
+    def key(query: str) -> str:
+
+        query = query.strip()
+
+        if (spotify_url := SPOTIFY_URL_REGEX.match(query)) is not None:
+            return f'spotify:{spotify_url.group("type")}:{spotify_url.group("id")}'
+
+        url = yarl.URL(query)
+        if not url.host or not url.scheme:
+
+            if query.startswith('soundcloud'):
+                return f'scsearch:{" ".join(query[11:].lower().split())}'
+
+            return f'ytsearch:{" ".join(query.lower().split())}'
+
+        host = url.host.lower()
+        if host.startswith('www.'):
+            host = host[4:]
+
+        if host == 'youtu.be':
+            return f'youtube:{url.path.strip("/")}:{url.query.get("list", "")}'
+        if host in YOUTUBE_HOSTS and url.path == '/watch':
+            return f'youtube:{url.query.get("v", "")}:{url.query.get("list", "")}'
+        if host in YOUTUBE_HOSTS and url.path == '/playlist':
+            return f'youtube::{url.query.get("list", "")}'
+
+        return str(url.with_host(host).with_fragment(None))
+
+    async def get(self, key: str, *, ctx: context.Context) -> Optional[objects.SearchResult]:
+
+        entry = self.cache.get(key)
+
+        if entry is None and self.redis:
+            try:
+                data = await self.bot.redis.get(f'search:{key}')
+            except aredis.RedisError as error:
+                __log__.warning(f'CACHE | Error while fetching search {key!r} from redis: {error!r}')
+                data = None
+
+            if data is not None:
+                entry = CachedSearch(**json.loads(data))
+                self.cache.put(key, entry)
+
+        if entry is None:
+            return None
+
+        __log__.debug(f'CACHE | Search cache hit for {key!r}.')
+        return entry.bind(ctx=ctx)
+
+    async def put(self, key: str, search: objects.SearchResult) -> None:
+
+        entry = CachedSearch.from_search(search)
+        self.cache.put(key, entry)
+
+        if not self.redis:
+            return
+
+        try:
+            await self.bot.redis.set(f'search:{key}', entry.to_json(), ex=self.bot.config.music['search_cache_ttl'])
+        except aredis.RedisError as error:
+            __log__.warning(f'CACHE | Error while storing search {key!r} in redis: {error!r}')
+
+    async def delete(self, key: str) -> None:
+
+        self.cache.pop(key)
+
+        if not self.redis:
+            return
+
+        try:
+            await self.bot.redis.delete(f'search:{key}')
+        except aredis.RedisError as error:
+            __log__.warning(f'CACHE | Error while deleting search {key!r} from redis: {error!r}')
@@ -0,0 +1,79 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import logging
+from typing import Any, List
+
+import ksoftapi
+
+from utilities import cache
+
+__log__ = logging.getLogger('slate.lyrics')
+
+
+def chunk_lyrics(lyrics: str, *, size: int = 1000) -> List[str]:
+
+    pages = []
+    lines = []
+    length = 0
+
+    for line in lyrics.split('\n'):
+
+        if lines and length + len(line) >= size:
+            pages.append('\n'.join(lines))
+            lines = []
+            length = 0
+
+        length += len(line) + 1 if lines else len(line)
+        lines.append(line)
+
+    if lines:
+        pages.append('\n'.join(lines))
+
+    return pages
+
+
+class LyricsCache:
+
+    def __init__(self, bot, client: ksoftapi.Client) -> None:
+        self.bot = bot
+        self.client = client
+
+        self.searches = cache.TTLCache(max_size=self.bot.config.music['lyrics_cache_size'], ttl=self.bot.config.music['lyrics_cache_ttl'])
+        self.pages = cache.TTLCache(max_size=self.bot.config.music['lyrics_cache_size'], ttl=self.bot.config.music['lyrics_cache_ttl'])
+
+    @staticmethod
+    def key(query: str) -> str:
+        return ' '.join(query.casefold().split())
+
+    async def search(self, query: str) -> List[Any]:
+
+        key = self.key(query)
+
+        if (results := self.searches.get(key)) is not None:
+            __log__.debug(f'LYRICS | Lyrics cache hit for {key!r}.')
+            return results
+
+        results = await self.client.music.lyrics(query=query, limit=20)
+        self.searches.put(key, results)
+
+        return results
+
+    def get_pages(self, result: Any) -> List[str]:
+
+        key = getattr(result, 'id', None) or (result.name, result.artist)
+
+        if (pages := self.pages.get(key)) is None:
+            pages = chunk_lyrics(result.lyrics)
+            self.pages.put(key, pages)
+
+        return pages
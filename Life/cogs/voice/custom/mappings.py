@@ -0,0 +1,147 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+from __future__ import annotations
+
+import json
+import logging
+from typing import Any, Dict, Optional, TYPE_CHECKING, Tuple
+
+import asyncpg
+import slate
+
+from cogs.voice.custom.cache import track_data
+from utilities import cache, context, exceptions
+
+if TYPE_CHECKING:
+    from cogs.voice.custom.player import Player
+
+__log__ = logging.getLogger('slate.mappings')
+
+
+class SpotifyTrackStore:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        self.cache = cache.TTLCache(max_size=self.bot.config.music['spotify_mapping_cache_size'])
+        self.resolved = cache.TTLCache(max_size=self.bot.config.music['spotify_mapping_cache_size'])
+
+        self.refreshing = set()
+
+    async def load(self) -> None:
+
+        await self.bot.db.execute(
+            '''
+            CREATE TABLE IF NOT EXISTS spotify_tracks (
+                spotify_id text PRIMARY KEY,
+                query      text NOT NULL,
+                track_id   text NOT NULL,
+                track_info jsonb NOT NULL,
+                updated_at timestamp NOT NULL DEFAULT (now() at time zone 'utc')
+            )
+            '''
+        )
+
+    async def get(self, *, spotify_id: str) -> Optional[Tuple[str, Dict[str, Any]]]:
+
+        if (mapping := self.cache.get(spotify_id)) is not None:
+            return mapping
+
+        try:
+            data = await self.bot.db.fetchrow('SELECT track_id, track_info FROM spotify_tracks WHERE spotify_id = $1', spotify_id)
+        except asyncpg.PostgresError as error:
+            __log__.warning(f'MAPPINGS | Error while fetching mapping for Spotify track {spotify_id!r}: {error!r}')
+            return None
+
+        if data is None:
+            return None
+
+        mapping = (data['track_id'], json.loads(data['track_info']))
+        self.cache.put(spotify_id, mapping)
+        return mapping
+
+    async def put(self, *, spotify_id: str, query: str, track: slate.Track) -> None:
+
+        mapping = track_data(track)
+        self.cache.put(spotify_id, mapping)
+
+        try:
+            await self.bot.db.execute(
+                'INSERT INTO spotify_tracks (spotify_id, query, track_id, track_info) VALUES ($1, $2, $3, $4::jsonb) ON CONFLICT (spotify_id) DO UPDATE '
+                'SET query = excluded.query, track_id = excluded.track_id, track_info = excluded.track_info, updated_at = (now() at time zone \'utc\')',
+                spotify_id, query, mapping[0], json.dumps(mapping[1])
+            )
+        except asyncpg.PostgresError as error:
+            __log__.warning(f'MAPPINGS | Error while storing mapping for Spotify track {spotify_id!r}: {error!r}')
+
+    async def delete(self, *, spotify_id: str) -> None:
+
+        self.cache.pop(spotify_id)
+
+        try:
+            await self.bot.db.execute('DELETE FROM spotify_tracks WHERE spotify_id = $1', spotify_id)
+        except asyncpg.PostgresError as error:
+            __log__.warning(f'MAPPINGS | Error while deleting mapping for Spotify track {spotify_id!r}: {error!r}')
+
+    #
+
+    async def resolve(self, *, player: Player, track: slate.Track) -> slate.Track:
+
+        spotify_id = track.identifier
+        query = f'{track.author} - {track.title}'
+
+        if (mapping := await self.get(spotify_id=spotify_id)) is not None:
+            resolved = slate.Track(track_id=mapping[0], ctx=track.ctx, track_info=dict(mapping[1]))
+
+        else:
+            async with player.resolve_semaphore:
+                search = await player.search(query=query, ctx=track.ctx)
+
+            resolved = search.tracks[0]
+            await self.put(spotify_id=spotify_id, query=query, track=resolved)
+
+        self.resolved.put(resolved.track_id, (spotify_id, query))
+        return resolved
+
+    async def refresh(self, *, player: Player, track_id: str, ctx: context.Context) -> None:
+
+        if (entry := self.resolved.pop(track_id)) is None:
+            return
+
+        spotify_id, query = entry
+        if spotify_id in self.refreshing:
+            return
+
+        self.refreshing.add(spotify_id)
+        __log__.info(f'MAPPINGS | Refreshing mapping for Spotify track {spotify_id!r} after track {track_id!r} failed to play.')
+
+        try:
+            self.cache.pop(spotify_id)
+
+            search_cache = self.bot.cogs['Music'].search_cache
+            await search_cache.delete(search_cache.key(query))
+
+            search = await player.search_source(query=query, ctx=ctx)
+
+            tracks = [track for track in search.tracks if track.track_id != track_id]
+            if not tracks:
+                await self.delete(spotify_id=spotify_id)
+                return
+
+            await self.put(spotify_id=spotify_id, query=query, track=tracks[0])
+
+        except exceptions.VoiceError:
+            await self.delete(spotify_id=spotify_id)
+
+        finally:
+            self.refreshing.discard(spotify_id)
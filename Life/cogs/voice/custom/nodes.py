@@ -0,0 +1,125 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import logging
+from typing import Collection, Dict, Optional
+
+import aredis
+import discord
+import slate
+from discord.ext import tasks
+
+from cogs.voice.custom.player import Player
+
+__log__ = logging.getLogger('slate.nodes')
+
+
+class NodeBalancer:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        self.balance_nodes.change_interval(seconds=self.bot.config.music['node_balance_interval'])
+        self.balance_nodes.start()
+
+    @property
+    def nodes(self) -> Dict[str, slate.BaseNode]:
+        return {identifier: node for identifier, node in self.bot.cogs['Music'].slate.nodes.items() if node.is_connected}
+
+    @staticmethod
+    def penalty(node: slate.BaseNode) -> float:
+
+        penalty = len(node.players)
+
+        if (stats := node.stats) is None:
+            return penalty
+
+        try:
+            penalty += 1.05 ** (100 * stats.system_load) * 10 - 10
+            frames_deficit, frames_nulled = stats.frames_deficit, stats.frames_nulled
+        except AttributeError:
+            # Andesite nodes don't report Lavalink's cpu and frame stats, so they are weighed by what they do report.
+            return penalty
+
+        if frames_deficit != -1:
+            penalty += 1.03 ** (500 * (frames_deficit / 3000)) * 600 - 600
+        if frames_nulled != -1:
+            penalty += (1.03 ** (500 * (frames_nulled / 3000)) * 300 - 300) * 2
+
+        return penalty
+
+    def best_node(self, *, exclude: Collection[str] = ()) -> Optional[slate.BaseNode]:
+
+        nodes = [node for identifier, node in self.nodes.items() if identifier not in exclude]
+        if not nodes:
+            return None
+
+        return min(nodes, key=self.penalty)
+
+    #
+
+    async def migrate(self, player: Player, *, node: slate.BaseNode) -> Optional[Player]:
+
+        snapshots = self.bot.cogs['Music'].snapshots
+        guild_id = player.guild.id
+
+        try:
+            await snapshots.save(player)
+        except aredis.RedisError as error:
+            __log__.warning(f'NODES | Error while saving snapshot before migrating player for guild {player.guild!r}: {error!r}')
+            return None
+
+        state, queue = await snapshots.fetch(guild_id=guild_id)
+        if state is None:
+            return None
+
+        __log__.info(f'NODES | Migrating player for guild {player.guild!r} from node {player.node.identifier!r} to node {node.identifier!r}.')
+        await player.destroy(delete_snapshot=False)
+
+        try:
+            return await snapshots.restore(guild_id=guild_id, state=state, queue=queue, node=node, notify=False)
+        except (slate.SlateException, discord.HTTPException) as error:
+            __log__.warning(f'NODES | Error while migrating player for guild {guild_id} to node {node.identifier!r}: {error!r}')
+
+    @tasks.loop(seconds=60)
+    async def balance_nodes(self) -> None:
+
+        nodes = self.nodes
+        if len(nodes) < 2:
+            return
+
+        penalties = {identifier: self.penalty(node) for identifier, node in nodes.items()}
+        worst = max(penalties, key=penalties.get)
+
+        if penalties[worst] < self.bot.config.music['migration_penalty']:
+            return
+
+        migrations = 0
+
+        for player in list(nodes[worst].players.values()):
+
+            if migrations >= self.bot.config.music['max_migrations']:
+                break
+            if not player.is_connected or not player.channel:
+                continue
+
+            target = self.best_node(exclude={worst})
+            if target is None or self.penalty(nodes[worst]) - self.penalty(target) < self.bot.config.music['migration_margin']:
+                break
+
+            await self.migrate(player, node=target)
+            migrations += 1
+
+    @balance_nodes.before_loop
+    async def before_balance_nodes(self) -> None:
+
+        await self.bot.wait_until_ready()
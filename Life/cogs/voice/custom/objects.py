@@ -10,7 +10,7 @@
 #  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
 #
 
-from typing import List, Union
+from typing import AsyncIterator, List, Optional, Union
 
 import slate
 import spotify
@@ -18,16 +18,20 @@ import spotify
 
 class SearchResult:
 
-    __slots__ = 'source', 'search_type', 'search_result', 'tracks'
+    __slots__ = 'source', 'search_type', 'search_result', 'tracks', 'name', 'total', 'remaining'
 
     def __init__(self, source: str, search_type: str,
-                 search_result: Union[spotify.Album, spotify.Playlist, spotify.Track, List[slate.Track], slate.Playlist],
-                 tracks: List[slate.Track]) -> None:
+                 search_result: Optional[Union[spotify.Album, spotify.Playlist, spotify.Track, List[slate.Track], slate.Playlist]],
+                 tracks: List[slate.Track], name: Optional[str] = None, total: Optional[int] = None,
+                 remaining: Optional[AsyncIterator[List[slate.Track]]] = None) -> None:
 
         self.source = source
         self.search_type = search_type
         self.search_result = search_result
         self.tracks = tracks
+        self.name = name
+        self.total = total or len(tracks)
+        self.remaining = remaining
 
     def __repr__(self) -> str:
         return f'<life.SearchResult source={self.source} search_type={self.search_type} search_result={self.search_result}>'
@@ -11,9 +11,11 @@
 #
 
 import asyncio
+import contextlib
 import logging
 import re
-from typing import List, Optional
+import time
+from typing import AsyncIterator, Awaitable, Callable, Dict, Iterable, List, Optional
 
 import async_timeout
 import discord
@@ -39,11 +41,20 @@ class Player(slate.Player):
         self.queue_add_event = asyncio.Event()
         self.track_start_event = asyncio.Event()
         self.track_end_event = asyncio.Event()
+        self.resolve_event = asyncio.Event()
 
         self.skip_requests: List[int] = []
 
         self.text_channel: Optional[discord.TextChannel] = None
         self.task: Optional[asyncio.Task] = None
+        self.resolver_task: Optional[asyncio.Task] = None
+
+        self.resolving: Dict[int, asyncio.Task] = {}
+        self.import_tasks = set()
+
+        self.restore_position: Optional[int] = None
+        self.restore_paused = False
+        self.resolve_semaphore = asyncio.Semaphore(self.bot.config.music['prefetch_concurrency'])
 
         self.spotify_url_regex = re.compile(r'https?://open.spotify.com/(?P<type>album|playlist|track)/(?P<id>[a-zA-Z0-9]+)')
 
@@ -55,6 +66,7 @@ class Player(slate.Player):
         __log__.info(f'PLAYER | Player for guild {self.guild!r} joined channel {self.channel!r}.')
 
         self.task = self.bot.loop.create_task(self.player_loop())
+        self.resolver_task = self.bot.loop.create_task(self.resolver_loop())
 
     async def disconnect(self, *, force: bool = True) -> None:
 
@@ -66,6 +78,18 @@ class Player(slate.Player):
 
         self.task.cancel()
         self.task = None
+
+        self.resolver_task.cancel()
+        self.resolver_task = None
+
+        for task in self.resolving.values():
+            task.cancel()
+        self.resolving.clear()
+
+        for task in self.import_tasks:
+            task.cancel()
+        self.import_tasks.clear()
+
         self.channel = None
 
     async def reconnect(self, *, channel: discord.VoiceChannel) -> None:
@@ -79,18 +103,22 @@ class Player(slate.Player):
         __log__.info(f'PLAYER | Player for guild {self.guild!r} has reconnected to voice channel: {channel} ')
 
         self.task = self.bot.loop.create_task(self.player_loop())
+        self.resolver_task = self.bot.loop.create_task(self.resolver_loop())
 
-    async def destroy(self) -> None:
+    async def destroy(self, *, delete_snapshot: bool = True) -> None:
 
         await self.disconnect()
         await self.cleanup()
 
+        if delete_snapshot:
+            await self.bot.cogs['Music'].snapshots.delete(guild_id=self.guild.id)
+
         if self.node.is_connected:
             await self.stop()
             await self.node._send(op='destroy', guildId=str(self.guild.id))
 
         __log__.info(f'PLAYER | Player for guild {self.guild!r} was destroyed.')
-        del self.node.players[self.guild.id]
+        self.node.players.pop(self.guild.id, None)
 
     #
 
@@ -100,7 +128,7 @@ class Player(slate.Player):
         embed.set_thumbnail(url=self.current.thumbnail)
         embed.add_field(name=f'Now playing:', value=f'**[{self.current.title}]({self.current.uri})**', inline=False)
 
-        queue_time = self.bot.utils.format_seconds(seconds=round(sum(track.length for track in self.queue)) / 1000, friendly=True)
+        queue_time = self.bot.utils.format_seconds(seconds=round(self.queue.length) / 1000, friendly=True)
 
         if self.current.ctx.guild_config.embed_size == 'normal':
 
@@ -147,8 +175,36 @@ class Player(slate.Player):
 
     async def search(self, query: str, ctx: context.Context) -> objects.SearchResult:
 
+        search_cache = self.bot.cogs['Music'].search_cache
+        key = search_cache.key(query)
+
+        if (search := await search_cache.get(key, ctx=ctx)) is not None:
+            return search
+
+        search = await self.search_source(query=query, ctx=ctx)
+
+        if search.remaining is None:
+            await search_cache.put(key, search)
+        else:
+            search.remaining = self.cache_pages(key=key, search=search)
+
+        return search
+
+    async def cache_pages(self, *, key: str, search: objects.SearchResult) -> AsyncIterator[List[slate.Track]]:
+
+        pages = search.remaining
+        tracks = list(search.tracks)
+
+        async for page in pages:
+            tracks.extend(page)
+            yield page
+
+        search = objects.SearchResult(source=search.source, search_type=search.search_type, search_result=search.search_result, tracks=tracks, name=search.name)
+        await self.bot.cogs['Music'].search_cache.put(key, search)
+
+    async def search_source(self, query: str, ctx: context.Context) -> objects.SearchResult:
+
         search_result = None
-        search_tracks = None
 
         spotify_url_check = self.spotify_url_regex.match(query)
         if spotify_url_check is not None:
@@ -161,31 +217,57 @@ class Player(slate.Player):
             search_type = spotify_url_check.group('type')
             spotify_id = spotify_url_check.group('id')
 
+            remaining = None
+
             try:
                 if search_type == 'album':
-                    search_result = await spotify_client.get_album(spotify_id=spotify_id)
-                    search_tracks = await search_result.get_all_tracks()
+                    data = await spotify_http_client.album(spotify_id)
+                    page, images, page_size = data['tracks'], data.get('images', []), 50
+
+                    async def fetch(offset: int) -> List[dict]:
+                        return (await spotify_http_client.album_tracks(spotify_id, limit=page_size, offset=offset))['items']
+
+                    tracks = [self.spotify_track(data=item, ctx=ctx, images=images) for item in page['items'] if item]
+                    search_result = spotify.Album(client=spotify_client, data=data)
+
                 elif search_type == 'playlist':
-                    search_result = spotify.Playlist(client=spotify_client, data=await spotify_http_client.get_playlist(spotify_id))
-                    search_tracks = await search_result.get_all_tracks()
+                    data = await spotify_http_client.get_playlist(spotify_id)
+                    page, images, page_size = data['tracks'], [], 100
+
+                    async def fetch(offset: int) -> List[dict]:
+                        return [item['track'] for item in (await spotify_http_client.get_playlist_tracks(spotify_id, limit=page_size, offset=offset))['items']]
+
+                    tracks = [self.spotify_track(data=item['track'], ctx=ctx, images=images) for item in page['items'] if item['track']]
+                    search_result = spotify.Playlist(client=spotify_client, data=data)
+
                 elif search_type == 'track':
                     search_result = await spotify_client.get_track(spotify_id=spotify_id)
-                    search_tracks = [search_result]
-
-            except spotify.NotFound or HTTPException:
+                    page = None
+                    tracks = [
+                        slate.Track(
+                                track_id='',
+                                ctx=ctx,
+                                track_info={'title': track.name or 'Unknown', 'author': ', '.join(artist.name for artist in track.artists) or 'Unknown',
+                                            'length': track.duration or 0, 'identifier': track.id or 'Unknown', 'uri': track.url or 'spotify',
+                                            'isStream': False, 'isSeekable': False, 'position': 0, 'thumbnail': track.images[0].url if track.images else None},
+                        ) for track in [search_result]
+                    ]
+
+            except (spotify.NotFound, HTTPException):
                 raise exceptions.VoiceError(f'No results were found for your Spotify link.')
-            if not search_tracks:
+
+            total = len(tracks)
+            if page is not None:
+                total = page['total']
+                if offsets := range(page_size, total, page_size):
+                    remaining = self.spotify_pages(fetch=fetch, offsets=offsets, ctx=ctx, images=images)
+
+            if not tracks:
                 raise exceptions.VoiceError(f'No results were found for your Spotify link.')
 
-            tracks = [
-                slate.Track(
-                        track_id='',
-                        ctx=ctx,
-                        track_info={'title': track.name or 'Unknown', 'author': ', '.join(artist.name for artist in track.artists) or 'Unknown',
-                                    'length': track.duration or 0, 'identifier': track.id or 'Unknown', 'uri': track.url or 'spotify',
-                                    'isStream': False, 'isSeekable': False, 'position': 0, 'thumbnail': track.images[0].url if track.images else None},
-                ) for track in search_tracks
-            ]
+            name = getattr(search_result, 'name', None)
+            return objects.SearchResult(source=source, search_type=search_type, search_result=search_result, tracks=tracks, name=name, total=total,
+                                        remaining=remaining)
 
         else:
 
@@ -215,10 +297,111 @@ class Player(slate.Player):
                 search_type = 'track'
                 tracks = search_result
 
-        return objects.SearchResult(source=source, search_type=search_type, search_result=search_result, tracks=tracks)
+        name = getattr(search_result, 'name', None)
+        return objects.SearchResult(source=source, search_type=search_type, search_result=search_result, tracks=tracks, name=name)
+
+    @staticmethod
+    def spotify_track(*, data: dict, ctx: context.Context, images: List[dict]) -> slate.Track:
+
+        images = data.get('album', {}).get('images') or images
+
+        return slate.Track(
+                track_id='',
+                ctx=ctx,
+                track_info={'title': data.get('name') or 'Unknown', 'author': ', '.join(artist['name'] for artist in data.get('artists', [])) or 'Unknown',
+                            'length': data.get('duration_ms') or 0, 'identifier': data.get('id') or 'Unknown', 'uri': data.get('external_urls', {}).get('spotify') or 'spotify',
+                            'isStream': False, 'isSeekable': False, 'position': 0, 'thumbnail': images[0]['url'] if images else None},
+        )
+
+    async def spotify_pages(self, *, fetch: Callable[[int], Awaitable[List[dict]]], offsets: Iterable[int], ctx: context.Context,
+                            images: List[dict]) -> AsyncIterator[List[slate.Track]]:
+
+        semaphore = asyncio.Semaphore(self.bot.config.music['spotify_page_concurrency'])
+
+        async def fetch_page(offset: int) -> List[dict]:
+            async with semaphore:
+                return await fetch(offset)
+
+        tasks = [self.bot.loop.create_task(fetch_page(offset)) for offset in offsets]
+
+        try:
+            for task in tasks:
+                yield [self.spotify_track(data=item, ctx=ctx, images=images) for item in await task if item]
+        finally:
+            for task in tasks:
+                task.cancel()
+
+    async def import_pages(self, *, search: objects.SearchResult, message: discord.Message) -> None:
+
+        imported = len(search.tracks)
+        last_edit = time.monotonic()
+
+        try:
+            async for tracks in search.remaining:
+                self.queue.put(items=tracks)
+                imported += len(tracks)
+
+                if time.monotonic() - last_edit >= self.bot.config.music['import_progress_interval']:
+                    last_edit = time.monotonic()
+                    with contextlib.suppress(discord.HTTPException):
+                        await message.edit(content=f'Importing the Spotify {search.search_type} `{search.name}`, queued `{imported}`/`{search.total}` tracks.')
+
+        except (spotify.NotFound, HTTPException) as error:
+            __log__.warning(f'PLAYER | Error while importing Spotify {search.search_type} {search.name!r} in guild {self.guild!r}: {error!r}')
+            with contextlib.suppress(discord.HTTPException):
+                await message.edit(content=f'Stopped importing the Spotify {search.search_type} `{search.name}` after `{imported}`/`{search.total}` tracks.')
+            return
+
+        except Exception as error:
+            __log__.error(f'PLAYER | Unexpected error while importing Spotify {search.search_type} {search.name!r} in guild {self.guild!r}: {error!r}', exc_info=error)
+            with contextlib.suppress(discord.HTTPException):
+                await message.edit(content=f'Something went wrong while importing the Spotify {search.search_type} `{search.name}`, '
+                                           f'stopped after `{imported}`/`{search.total}` tracks.')
+            return
+
+        finally:
+            self.import_tasks.discard(asyncio.current_task())
+
+        with contextlib.suppress(discord.HTTPException):
+            await message.edit(content=f'Added the Spotify {search.search_type} `{search.name}` to the queue with a total of `{imported}` tracks.')
 
     #
 
+    async def resolve_track(self, track: slate.Track) -> slate.Track:
+
+        try:
+            resolved = await self.bot.cogs['Music'].spotify_tracks.resolve(player=self, track=track)
+        except exceptions.VoiceError:
+            if self.queue.remove(track):
+                await self.send(message=f'I was unable to find a playable version of the Spotify track `{track.title}`, it has been removed from the queue.')
+            raise
+        finally:
+            self.resolving.pop(id(track), None)
+
+        self.queue.replace(track, resolved)
+
+        __log__.debug(f'PLAYER | Player for guild {self.guild!r} resolved Spotify track {track.title!r} to {resolved.uri!r}.')
+        return resolved
+
+    def prefetch_track(self, track: slate.Track) -> asyncio.Task:
+
+        if (task := self.resolving.get(id(track))) is None:
+            task = self.resolving[id(track)] = self.bot.loop.create_task(self.resolve_track(track))
+            task.add_done_callback(lambda future: future.cancelled() or future.exception())
+
+        return task
+
+    async def resolver_loop(self) -> None:
+
+        while True:
+
+            await self.resolve_event.wait()
+            self.resolve_event.clear()
+
+            for track in self.queue[:self.bot.config.music['prefetch']]:
+                if track.source == 'Spotify':
+                    self.prefetch_track(track)
+
     async def player_loop(self) -> None:
 
         while True:
@@ -238,17 +421,18 @@ class Player(slate.Player):
                     await self.send(message=f'No tracks were added to the queue for `{timeout}s`. The player has disconnected temporarily.')
                     await self.stop()
                     await self.disconnect()
+                    await self.bot.cogs['Music'].snapshots.delete(guild_id=self.guild.id)
                     break
 
             track = self.queue.get()
+            self.resolve_event.set()
 
             if track.source == 'Spotify':
                 try:
-                    search = await self.search(query=f'{track.author} - {track.title}', ctx=track.ctx)
+                    track = await self.prefetch_track(track)
                 except exceptions.VoiceError as error:
                     await self.send(message=f'{error}')
                     continue
-                track = search.tracks[0]
 
             await self.play(track=track)
 
@@ -259,9 +443,17 @@ class Player(slate.Player):
                 await self.send(message=f'Something went wrong while starting the track `{track.title}`. Use `{self.bot.config.prefix}support` for help.')
                 continue
 
+            if self.restore_position:
+                await self.set_position(position=self.restore_position)
+            if self.restore_paused:
+                await self.set_pause(pause=True)
+
+            self.restore_position = None
+            self.restore_paused = False
+
             await self.track_end_event.wait()
 
             if self.queue.is_looping:
-                self.queue.put(items=track, position=0 if self.queue.is_looping_current else None)
+                self.queue.put(items=track, position=0 if self.queue.is_looping_current else None, keep_sort=True)
 
             self._current = None
@@ -12,23 +12,314 @@
 
 from __future__ import annotations
 
-from typing import Any, List, TYPE_CHECKING, Union
-
-import slate
+import collections
+import itertools
+import random
+from typing import Any, Callable, Dict, Iterator, List, Optional, TYPE_CHECKING, Tuple, Union
 
 if TYPE_CHECKING:
     from cogs.voice.custom.player import Player
 
 
-class Queue(slate.Queue):
+BLOCK_SIZE = 256
+
+SORT_METHODS: Dict[str, Callable[[Any], Any]] = {
+    'title':  lambda track: track.title.casefold(),
+    'author': lambda track: track.author.casefold(),
+    'length': lambda track: track.length,
+}
+
+
+class SortKey:
+
+    __slots__ = ('values', 'reverse')
+
+    def __init__(self, values: Tuple[Any, ...], reverse: bool) -> None:
+        self.values = values
+        self.reverse = reverse
+
+    def __lt__(self, other: SortKey) -> bool:
+        return other.values < self.values if self.reverse else self.values < other.values
+
+
+class Queue:
+
+    __slots__ = ('player', 'blocks', 'size', 'length', 'history', 'is_looping', 'is_looping_current', 'sort_methods', 'sort_reverse', 'version')
 
     def __init__(self, player: Player) -> None:
-        super().__init__()
 
         self.player = player
 
-    def _put(self, iterable: List, items: Union[List[Any], Any], position: int = None) -> None:
-        super()._put(iterable=iterable, items=items, position=position)
+        self.blocks: List[List[Any]] = []
+        self.size = 0
+        self.length = 0
+
+        self.history: collections.deque = collections.deque(maxlen=self.player.bot.config.music['history_size'])
+
+        self.is_looping = False
+        self.is_looping_current = False
+
+        self.sort_methods: Optional[Tuple[str, ...]] = None
+        self.sort_reverse = False
+
+        self.version = 0
+
+    def __repr__(self) -> str:
+        return f'<life.Queue entries={self.size} blocks={len(self.blocks)} length={self.length} history={len(self.history)}>'
+
+    def __len__(self) -> int:
+        return self.size
+
+    def __iter__(self) -> Iterator[Any]:
+        return itertools.chain.from_iterable(self.blocks)
+
+    def __getitem__(self, index: Union[int, slice]) -> Union[Any, List[Any]]:
+
+        if isinstance(index, slice):
+
+            start, stop, step = index.indices(self.size)
+            if step != 1:
+                return list(self)[index]
+            if start >= stop:
+                return []
+
+            block_index, offset = self._locate(start)
+            items = []
+
+            for block in itertools.islice(self.blocks, block_index, None):
+                items.extend(block[offset:offset + stop - start - len(items)])
+                offset = 0
+                if len(items) >= stop - start:
+                    break
+
+            return items
+
+        block_index, offset = self._locate(index)
+        return self.blocks[block_index][offset]
+
+    @property
+    def is_empty(self) -> bool:
+        return self.size == 0
+
+    @property
+    def is_sorted(self) -> bool:
+        return self.sort_methods is not None
+
+    #
+
+    def _locate(self, index: int) -> Tuple[int, int]:
+
+        if index < 0:
+            index += self.size
+        if index < 0 or index >= self.size:
+            raise IndexError('queue index out of range')
+
+        if index >= self.size - len(self.blocks[-1]):
+            return len(self.blocks) - 1, index - (self.size - len(self.blocks[-1]))
+
+        for block_index, block in enumerate(self.blocks):
+            if index < len(block):
+                return block_index, index
+            index -= len(block)
+
+    def _split(self, block_index: int) -> None:
+
+        block = self.blocks[block_index]
+        if len(block) <= BLOCK_SIZE * 2:
+            return
+
+        self.blocks[block_index:block_index + 1] = [block[index:index + BLOCK_SIZE] for index in range(0, len(block), BLOCK_SIZE)]
+
+    def _pop(self, block_index: int, offset: int) -> Any:
+
+        block = self.blocks[block_index]
+        item = block.pop(offset)
+
+        if not block:
+            del self.blocks[block_index]
+        elif len(block) < BLOCK_SIZE // 2 and block_index + 1 < len(self.blocks) and len(block) + len(self.blocks[block_index + 1]) <= BLOCK_SIZE * 2:
+            block.extend(self.blocks.pop(block_index + 1))
+
+        self.size -= 1
+        self.length -= item.length
+        self.version += 1
+
+        return item
+
+    def _rebuild(self, items: List[Any]) -> None:
+
+        self.blocks = [items[index:index + BLOCK_SIZE] for index in range(0, len(items), BLOCK_SIZE)]
+        self.version += 1
+
+    def _sort_key(self, item: Any) -> SortKey:
+        return SortKey(tuple(SORT_METHODS[method](item) for method in self.sort_methods), self.sort_reverse)
+
+    def _insert_sorted(self, item: Any) -> None:
+
+        key = self._sort_key(item)
+
+        low, high = 0, len(self.blocks)
+        while low < high:
+            middle = (low + high) // 2
+            if key < self._sort_key(self.blocks[middle][-1]):
+                high = middle
+            else:
+                low = middle + 1
+
+        block_index = min(low, len(self.blocks) - 1)
+        block = self.blocks[block_index]
+
+        low, high = 0, len(block)
+        while low < high:
+            middle = (low + high) // 2
+            if key < self._sort_key(block[middle]):
+                high = middle
+            else:
+                low = middle + 1
+
+        block.insert(low, item)
+        self._split(block_index)
+
+    def _added(self) -> None:
+
+        self.version += 1
 
         self.player.queue_add_event.set()
         self.player.queue_add_event.clear()
+
+        self.player.resolve_event.set()
+
+    #
+
+    def put(self, *, items: Union[List[Any], Any], position: Optional[int] = None, keep_sort: bool = False) -> None:
+
+        if not isinstance(items, list):
+            items = [items]
+        if not items:
+            return
+
+        if self.is_sorted and position is None:
+
+            if not self.blocks or len(items) > BLOCK_SIZE:
+                self._rebuild(sorted(itertools.chain(self, items), key=self._sort_key))
+            else:
+                for item in items:
+                    self._insert_sorted(item)
+
+            self.size += len(items)
+            self.length += sum(item.length for item in items)
+
+            self._added()
+            return
+
+        if position is not None and not keep_sort:
+            self.sort_methods = None
+
+        if position is not None and position < 0:
+            position = max(position + self.size, 0)
+
+        if position is None or position >= self.size:
+            block_index, offset = len(self.blocks) - 1, None
+        else:
+            block_index, offset = self._locate(position)
+
+        if block_index < 0:
+            self.blocks.append([])
+            block_index = 0
+
+        block = self.blocks[block_index]
+        if offset is None:
+            block.extend(items)
+        else:
+            block[offset:offset] = items
+
+        self.size += len(items)
+        self.length += sum(item.length for item in items)
+
+        self._split(block_index)
+        self._added()
+
+    def get(self, *, position: int = 0, put_history: bool = True) -> Any:
+
+        item = self._pop(*self._locate(position))
+
+        if put_history:
+            self.history.appendleft(item)
+
+        return item
+
+    def move(self, *, position: int, new_position: int) -> Any:
+
+        self.sort_methods = None
+
+        item = self.get(position=position, put_history=False)
+        self.put(items=item, position=new_position)
+
+        return item
+
+    def replace(self, old: Any, new: Any) -> bool:
+
+        for block_index, block in enumerate(self.blocks):
+            for index, item in enumerate(block):
+                if item is old:
+
+                    if self.is_sorted:
+                        self._pop(block_index, index)
+                        self.put(items=new)
+                        return True
+
+                    block[index] = new
+                    self.length += new.length - old.length
+                    self.version += 1
+                    return True
+
+        return False
+
+    def remove(self, item: Any) -> bool:
+
+        for block_index, block in enumerate(self.blocks):
+            for index, queued in enumerate(block):
+                if queued is item:
+                    self._pop(block_index, index)
+                    return True
+
+        return False
+
+    def clear(self) -> None:
+
+        self.blocks.clear()
+        self.size = 0
+        self.length = 0
+        self.version += 1
+
+    def clear_history(self) -> None:
+        self.history.clear()
+
+    def shuffle(self) -> None:
+
+        self.sort_methods = None
+
+        items = list(self)
+        random.shuffle(items)
+        self._rebuild(items)
+
+    def reverse(self) -> None:
+
+        self.sort_methods = None
+
+        items = list(self)
+        items.reverse()
+        self._rebuild(items)
+
+    def set_sorting(self, *, methods: Optional[List[str]], reverse: bool = False) -> None:
+
+        self.sort_methods = tuple(methods) if methods else None
+        self.sort_reverse = reverse
+
+        if self.is_sorted:
+            self._rebuild(sorted(self, key=self._sort_key))
+
+    def set_looping(self, *, looping: bool, current: bool = False) -> None:
+
+        self.is_looping = looping
+        self.is_looping_current = current
@@ -0,0 +1,274 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import json
+import logging
+from typing import Any, Dict, List, Optional, Set, Tuple
+
+import aiohttp
+import aredis
+import discord
+import slate
+from discord.ext import tasks
+
+from cogs.voice.custom.cache import track_data
+from cogs.voice.custom.player import Player
+from utilities import context
+
+__log__ = logging.getLogger('slate.snapshots')
+
+
+class PlayerSnapshots:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        self.versions: Dict[int, int] = {}
+        self.pending: Set[int] = set()
+
+        self.save_snapshots.change_interval(seconds=self.bot.config.music['snapshot_interval'])
+        self.save_snapshots.start()
+
+    @staticmethod
+    def track_entry(track: slate.Track) -> List[Any]:
+
+        entry = [track.track_id, track.ctx.author.id, getattr(track.ctx.channel, 'id', None)]
+        if not track.track_id:
+            entry.append(track_data(track)[1])
+
+        return entry
+
+    def state(self, player: Player) -> Dict[str, Any]:
+
+        return {
+            'channel_id': player.channel.id,
+            'text_channel_id': getattr(player.text_channel, 'id', None),
+            'node': player.node.identifier,
+            'volume': player.volume,
+            'paused': player.is_paused,
+            'position': player.position if player.current else 0,
+            'looping': player.queue.is_looping,
+            'looping_current': player.queue.is_looping_current,
+            'sort_methods': player.queue.sort_methods,
+            'sort_reverse': player.queue.sort_reverse,
+            'current': self.track_entry(player.current) if player.current else None,
+        }
+
+    #
+
+    async def save(self, player: Player) -> None:
+
+        guild_id = player.guild.id
+        ttl = self.bot.config.music['snapshot_ttl']
+
+        pipeline = await self.bot.redis.pipeline()
+        await pipeline.set(f'player:{guild_id}', json.dumps(self.state(player)), ex=ttl)
+
+        if self.versions.get(guild_id) != player.queue.version:
+            await pipeline.set(f'player:{guild_id}:queue', json.dumps([self.track_entry(track) for track in player.queue]), ex=ttl)
+        else:
+            await pipeline.expire(f'player:{guild_id}:queue', ttl)
+
+        await pipeline.sadd('players', guild_id)
+        await pipeline.execute()
+
+        self.versions[guild_id] = player.queue.version
+
+    async def fetch(self, *, guild_id: int) -> Tuple[Optional[Dict[str, Any]], List[List[Any]]]:
+
+        state, queue = await self.bot.redis.mget(f'player:{guild_id}', f'player:{guild_id}:queue')
+        return json.loads(state) if state else None, json.loads(queue) if queue else []
+
+    async def delete(self, *, guild_id: int) -> None:
+
+        self.versions.pop(guild_id, None)
+        self.pending.discard(guild_id)
+
+        try:
+            await self.bot.redis.delete(f'player:{guild_id}', f'player:{guild_id}:queue')
+            await self.bot.redis.srem('players', guild_id)
+        except aredis.RedisError as error:
+            __log__.warning(f'SNAPSHOTS | Error while deleting snapshot for guild {guild_id}: {error!r}')
+
+    @tasks.loop(seconds=30)
+    async def save_snapshots(self) -> None:
+
+        if self.pending:
+            await self.retry_failovers()
+
+        for player in list(self.bot.voice_clients):
+
+            if not isinstance(player, Player) or not player.is_connected or not player.channel:
+                continue
+
+            if not player.node.is_connected:
+                await self.failover(player)
+                continue
+
+            try:
+                await self.save(player)
+            except aredis.RedisError as error:
+                __log__.warning(f'SNAPSHOTS | Error while saving snapshot for guild {player.guild!r}: {error!r}')
+
+    @save_snapshots.before_loop
+    async def before_save_snapshots(self) -> None:
+
+        await self.bot.wait_until_ready()
+
+    #
+
+    async def decode(self, *, node: slate.BaseNode, track_ids: List[str]) -> Dict[str, Dict[str, Any]]:
+
+        decoded = {}
+
+        try:
+            for index in range(0, len(track_ids), 1000):
+                async with self.bot.session.post(f'http://{node.host}:{node.port}/decodetracks', json=track_ids[index:index + 1000],
+                                                 headers={'Authorization': node.password}) as response:
+                    response.raise_for_status()
+                    data = await response.json()
+
+                decoded.update({entry['track']: entry['info'] for entry in data})
+
+        except (aiohttp.ClientError, KeyError, TypeError) as error:
+            __log__.warning(f'SNAPSHOTS | Bulk decode on node {node.identifier!r} failed, decoding tracks individually: {error!r}')
+
+            for track_id in track_ids:
+                if track_id in decoded:
+                    continue
+                try:
+                    decoded[track_id] = track_data(await node.decode_tracks(track_id=track_id, retry=False))[1]
+                except slate.TrackDecodeError:
+                    continue
+
+        return decoded
+
+    async def restore(self, *, guild_id: int, state: Dict[str, Any], queue: List[List[Any]], node: Optional[slate.BaseNode] = None,
+                      notify: bool = True) -> Optional[Player]:
+
+        guild = self.bot.get_guild(guild_id)
+        channel = self.bot.get_channel(state['channel_id'])
+
+        if not guild or not isinstance(channel, discord.VoiceChannel) or not any(not member.bot for member in channel.members):
+            await self.delete(guild_id=guild_id)
+            return None
+
+        if state['current']:
+            queue.insert(0, state['current'])
+
+        music = self.bot.cogs['Music']
+        await music.slate.create_player(channel=channel, cls=Player, node=node or music.balancer.best_node())
+        player: Player = guild.voice_client
+        player.text_channel = self.bot.get_channel(state['text_channel_id'])
+
+        decoded = await self.decode(node=player.node, track_ids=list({entry[0] for entry in queue if entry[0]}))
+        contexts = {}
+        tracks = []
+
+        for track_id, author_id, channel_id, *info in queue:
+
+            if track_id and track_id not in decoded:
+                continue
+
+            if (ctx := contexts.get((author_id, channel_id))) is None:
+                author = guild.get_member(author_id) or self.bot.get_user(author_id) or guild.me
+                ctx = contexts[(author_id, channel_id)] = context.PartialContext(bot=self.bot, guild=guild, channel=self.bot.get_channel(channel_id), author=author)
+
+            tracks.append(slate.Track(track_id=track_id, ctx=ctx, track_info=dict(decoded[track_id] if track_id else info[0])))
+
+        player.queue.set_looping(looping=state['looping'], current=state['looping_current'])
+        player.queue.put(items=tracks)
+        player.queue.sort_methods = tuple(state['sort_methods']) if state['sort_methods'] else None
+        player.queue.sort_reverse = state['sort_reverse']
+
+        if state['current'] and tracks and tracks[0].track_id == state['current'][0]:
+            player.restore_position = state['position']
+        player.restore_paused = state['paused']
+
+        await player.set_volume(volume=state['volume'])
+
+        __log__.info(f'SNAPSHOTS | Restored player for guild {guild!r} on node {player.node.identifier!r} with {len(tracks)} of {len(queue)} tracks.')
+        if notify:
+            await player.send(message=f'The player was restored with `{len(tracks)}` track(s) in the queue.')
+
+        return player
+
+    async def restore_all(self) -> None:
+
+        for guild_id in await self.bot.redis.smembers('players'):
+
+            guild_id = int(guild_id)
+            state, queue = await self.fetch(guild_id=guild_id)
+
+            if state is None:
+                await self.delete(guild_id=guild_id)
+                continue
+
+            try:
+                await self.restore(guild_id=guild_id, state=state, queue=queue)
+            except (slate.SlateException, discord.HTTPException) as error:
+                __log__.warning(f'SNAPSHOTS | Error while restoring player for guild {guild_id}: {error!r}')
+
+    async def failover(self, player: Player) -> None:
+
+        guild_id = player.guild.id
+
+        state, queue = await self.fetch(guild_id=guild_id)
+        if state is None:
+            return
+
+        __log__.warning(f'SNAPSHOTS | Node {player.node.identifier!r} for guild {player.guild!r} is disconnected, restoring player from its snapshot.')
+
+        await player.destroy(delete_snapshot=False)
+
+        if (node := self.bot.cogs['Music'].balancer.best_node()) is None:
+            __log__.warning(f'SNAPSHOTS | No node is available to restore the player for guild {player.guild!r}, retrying when one connects.')
+            self.pending.add(guild_id)
+            return
+
+        try:
+            await self.restore(guild_id=guild_id, state=state, queue=queue, node=node)
+        except (slate.SlateException, discord.HTTPException) as error:
+            __log__.warning(f'SNAPSHOTS | Error while restoring player for guild {guild_id}: {error!r}')
+
+    async def retry_failovers(self) -> None:
+
+        if (node := self.bot.cogs['Music'].balancer.best_node()) is None:
+
+            ttl = self.bot.config.music['snapshot_ttl']
+
+            try:
+                pipeline = await self.bot.redis.pipeline()
+                for guild_id in self.pending:
+                    await pipeline.expire(f'player:{guild_id}', ttl)
+                    await pipeline.expire(f'player:{guild_id}:queue', ttl)
+                await pipeline.execute()
+            except aredis.RedisError as error:
+                __log__.warning(f'SNAPSHOTS | Error while refreshing pending snapshots: {error!r}')
+
+            return
+
+        for guild_id in list(self.pending):
+
+            self.pending.discard(guild_id)
+
+            if (guild := self.bot.get_guild(guild_id)) is None or guild.voice_client is not None:
+                continue
+
+            state, queue = await self.fetch(guild_id=guild_id)
+            if state is None:
+                continue
+
+            try:
+                await self.restore(guild_id=guild_id, state=state, queue=queue, node=node)
+            except (slate.SlateException, discord.HTTPException) as error:
+                __log__.warning(f'SNAPSHOTS | Error while restoring player for guild {guild_id}: {error!r}')
@@ -11,7 +11,7 @@
 #
 
 import asyncio
-from typing import Literal
+from typing import List, Literal
 
 import discord
 import ksoftapi
@@ -20,6 +20,7 @@ import spotify
 from discord.ext import commands
 
 from bot import Life
+from cogs.voice.custom import cache, lyrics, mappings, nodes, snapshots
 from cogs.voice.custom.player import Player
 from utilities import context, exceptions
 
@@ -35,9 +36,17 @@ class Music(commands.Cog):
         self.spotify_http = spotify.HTTPClient(client_id=self.bot.config.spotify_client_id, client_secret=self.bot.config.spotify_client_secret)
 
         self.ksoft = ksoftapi.Client(self.bot.config.ksoft_token)
+        self.lyrics_cache = lyrics.LyricsCache(bot=self.bot, client=self.ksoft)
+
+        self.search_cache = cache.SearchCache(bot=self.bot)
+        self.spotify_tracks = mappings.SpotifyTrackStore(bot=self.bot)
+        self.snapshots = snapshots.PlayerSnapshots(bot=self.bot)
+        self.balancer = nodes.NodeBalancer(bot=self.bot)
 
     async def load(self) -> None:
 
+        await self.spotify_tracks.load()
+
         for node in self.bot.config.nodes:
             try:
                 await self.slate.create_node(cls=getattr(slate, node.pop('type')), **node)
@@ -46,6 +55,13 @@ class Music(commands.Cog):
             else:
                 print(f'[SLATE] Node \'{node["identifier"]}\' connected.')
 
+        await self.snapshots.restore_all()
+
+    def cog_unload(self) -> None:
+
+        self.snapshots.save_snapshots.cancel()
+        self.balancer.balance_nodes.cancel()
+
     #
 
     @commands.Cog.listener()
@@ -76,6 +92,9 @@ class Music(commands.Cog):
         title = getattr(track or event.player.current, 'title', 'Not Found')
         await event.player.send(message=f'There was an error of severity `{event.severity}` while playing the track `{title}`.\nReason: {event.message}')
 
+        if (ctx := getattr(event.player.current, 'ctx', None)) is not None:
+            self.bot.loop.create_task(self.spotify_tracks.refresh(player=event.player, track_id=event.track, ctx=ctx))
+
         event.player.track_end_event.set()
         event.player.track_end_event.clear()
 
@@ -93,6 +112,9 @@ class Music(commands.Cog):
         title = getattr(track or event.player.current, 'title', 'Not Found')
         await event.player.send(message=f'Something went wrong while playing the track `{title}`. Use `{self.bot.config.prefix}support` for more help.')
 
+        if (ctx := getattr(event.player.current, 'ctx', None)) is not None:
+            self.bot.loop.create_task(self.spotify_tracks.refresh(player=event.player, track_id=event.track, ctx=ctx))
+
         event.player.track_end_event.set()
         event.player.track_end_event.clear()
 
@@ -100,6 +122,26 @@ class Music(commands.Cog):
 
     #
 
+    def track_entries(self, tracks: List[slate.Track], *, start: int = 0) -> List[str]:
+
+        return [
+            f'`{index + 1}.` [{str(track.title)}]({track.uri}) | {self.bot.utils.format_seconds(seconds=round(track.length) / 1000)} | {track.requester.mention}'
+            for index, track in enumerate(tracks, start=start)
+        ]
+
+    def track_embed(self, ctx: context.Context, *, track: slate.Track, index: int, total: int, location: str) -> discord.Embed:
+
+        embed = discord.Embed(colour=ctx.colour)
+        embed.set_image(url=track.thumbnail)
+        embed.description = f'Showing detailed information about track `{index + 1}` out of `{total}` in the {location}.\n\n' \
+                            f'[{track.title}]({track.uri})\n\n`Author:` {track.author}\n`Source:` {track.source}\n' \
+                            f'`Length:` {self.bot.utils.format_seconds(seconds=round(track.length) / 1000, friendly=True)}\n' \
+                            f'`Live:` {track.is_stream}\n`Seekable:` {track.is_seekable}\n`Requester:` {track.requester.mention}'
+
+        return embed
+
+    #
+
     @commands.command(name='join', aliases=['connect'])
     async def join(self, ctx: context.Context) -> None:
         """
@@ -116,7 +158,9 @@ class Music(commands.Cog):
         if ctx.voice_client:
             await ctx.voice_client.reconnect(channel=channel)
         else:
-            await self.slate.create_player(channel=channel, cls=Player)
+            if (node := self.balancer.best_node()) is None:
+                raise exceptions.VoiceError(f'There are no music nodes available right now. For support use `{self.bot.config.prefix}support`.')
+            await self.slate.create_player(channel=channel, cls=Player, node=node)
 
         ctx.voice_client.text_channel = ctx.channel
         await ctx.send(f'Joined the voice channel `{channel}`.')
@@ -147,9 +191,11 @@ class Music(commands.Cog):
 
             if search.source == 'spotify':
 
-                message = f'Added the Spotify {search.search_type} `{search.search_result.name}` to the queue.'
+                message = f'Added the Spotify {search.search_type} `{search.name}` to the queue.'
                 if search.search_type in ('album', 'playlist'):
-                    message = f'{message[:-1]} with a total of `{len(search.tracks)}` tracks.'
+                    message = f'{message[:-1]} with a total of `{search.total}` tracks.'
+                if search.remaining is not None:
+                    message = f'Importing the Spotify {search.search_type} `{search.name}`, queued `{len(search.tracks)}`/`{search.total}` tracks.'
 
                 tracks = search.tracks
 
@@ -159,11 +205,15 @@ class Music(commands.Cog):
                     message = f'Added the {search.source} {search.search_type} `{search.tracks[0].title}` to the queue.'
                     tracks = [search.tracks[0]]
                 elif search.search_type == 'playlist':
-                    message = f'Added the {search.source} {search.search_type} `{search.search_result.name}` to the queue with a total of **{len(search.tracks)}** track(s)'
+                    message = f'Added the {search.source} {search.search_type} `{search.name}` to the queue with a total of **{len(search.tracks)}** track(s)'
                     tracks = search.tracks
 
             ctx.voice_client.queue.put(items=tracks)
-            await ctx.send(message)
+            message = await ctx.send(message)
+
+            if search.remaining is not None:
+                task = self.bot.loop.create_task(ctx.voice_client.import_pages(search=search, message=message))
+                ctx.voice_client.import_tasks.add(task)
 
     @commands.command(name='leave', aliases=['disconnect', 'dc'])
     async def leave(self, ctx: context.Context) -> None:
@@ -181,6 +231,7 @@ class Music(commands.Cog):
         await ctx.send(f'Left the voice channel `{ctx.voice_client.channel}`.')
         await ctx.voice_client.stop()
         await ctx.voice_client.disconnect()
+        await self.snapshots.delete(guild_id=ctx.guild.id)
 
     @commands.command(name='destroy')
     async def destroy(self, ctx: context.Context) -> None:
@@ -363,15 +414,13 @@ class Music(commands.Cog):
         if ctx.voice_client.queue.is_empty:
             raise exceptions.VoiceError('The players queue is empty.')
 
-        time = self.bot.utils.format_seconds(seconds=round(sum(track.length for track in ctx.voice_client.queue)) / 1000, friendly=True)
-        header = f'Showing `{min([10, len(ctx.voice_client.queue)])}` out of `{len(ctx.voice_client.queue)}` track(s) in the queue. Total queue time is `{time}`.\n\n'
+        queue = ctx.voice_client.queue
 
-        entries = [
-            f'`{index + 1}.` [{str(track.title)}]({track.uri}) | {self.bot.utils.format_seconds(seconds=round(track.length) / 1000)} | {track.requester.mention}'
-            for index, track in enumerate(ctx.voice_client.queue)
-        ]
+        time = self.bot.utils.format_seconds(seconds=round(queue.length) / 1000, friendly=True)
+        header = f'Showing `{min([10, len(queue)])}` out of `{len(queue)}` track(s) in the queue. Total queue time is `{time}`.\n\n'
 
-        await ctx.paginate_embed(entries=entries, per_page=10, title='Queue:', header=header)
+        await ctx.paginate_embed(page_fetcher=lambda page: self.track_entries(queue[page * 10:page * 10 + 10], start=page * 10), total_entries=len(queue),
+                                 per_page=10, title='Queue:', header=header)
 
     @queue.command(name='detailed', aliases=['d'])
     async def queue_detailed(self, ctx: context.Context) -> None:
@@ -384,17 +433,16 @@ class Music(commands.Cog):
         if ctx.voice_client.queue.is_empty:
             raise exceptions.VoiceError('The players queue is empty.')
 
-        entries = []
-        for index, track in enumerate(ctx.voice_client.queue):
-            embed = discord.Embed(colour=ctx.colour)
-            embed.set_image(url=track.thumbnail)
-            embed.description = f'Showing detailed information about track `{index + 1}` out of `{len(ctx.voice_client.queue)}` in the queue.\n\n' \
-                                f'[{track.title}]({track.uri})\n\n`Author:` {track.author}\n`Source:` {track.source}\n' \
-                                f'`Length:` {self.bot.utils.format_seconds(seconds=round(track.length) / 1000, friendly=True)}\n' \
-                                f'`Live:` {track.is_stream}\n`Seekable:` {track.is_seekable}\n`Requester:` {track.requester.mention}'
-            entries.append(embed)
+        queue = ctx.voice_client.queue
+
+        def page_fetcher(page: int) -> List[discord.Embed]:
+
+            if page >= len(queue):
+                return [discord.Embed(colour=ctx.colour, description='This track is no longer in the queue.')]
+
+            return [self.track_embed(ctx, track=queue[page], index=page, total=len(queue), location='queue')]
 
-        await ctx.paginate_embeds(entries=entries)
+        await ctx.paginate_embeds(page_fetcher=page_fetcher, total_entries=len(queue))
 
     @queue.command(name='clear', aliases=['c'])
     async def queue_clear(self, ctx: context.Context) -> None:
@@ -431,12 +479,8 @@ class Music(commands.Cog):
         time = self.bot.utils.format_seconds(seconds=round(sum(track.length for track in history)) / 1000, friendly=True)
         header = f'Showing `{min([10, len(history)])}` out of `{len(history)}` track(s) in the queues history. Total queue history time is `{time}`.\n\n'
 
-        entries = [
-            f'`{index + 1}.` [{str(track.title)}]({track.uri}) | {self.bot.utils.format_seconds(seconds=round(track.length) / 1000)} | {track.requester.mention}'
-            for index, track in enumerate(history)
-        ]
-
-        await ctx.paginate_embed(entries=entries, per_page=10, title='Queue history:', header=header)
+        await ctx.paginate_embed(page_fetcher=lambda page: self.track_entries(history[page * 10:page * 10 + 10], start=page * 10), total_entries=len(history),
+                                 per_page=10, title='Queue history:', header=header)
 
     @queue_history.command(name='detailed', aliases=['d'])
     async def queue_history_detailed(self, ctx: context.Context) -> None:
@@ -451,17 +495,8 @@ class Music(commands.Cog):
         if not history:
             raise exceptions.VoiceError('The queue history is empty.')
 
-        entries = []
-        for index, track in enumerate(history):
-            embed = discord.Embed(colour=ctx.colour)
-            embed.set_image(url=track.thumbnail)
-            embed.description = f'Showing detailed information about track `{index + 1}` out of `{len(history)}` in the queue history.\n\n' \
-                                f'[{track.title}]({track.uri})\n\n`Author:` {track.author}\n`Source:` {track.source}\n' \
-                                f'`Length:` {self.bot.utils.format_seconds(seconds=round(track.length) / 1000, friendly=True)}\n' \
-                                f'`Live:` {track.is_stream}\n`Seekable:` {track.is_seekable}\n`Requester:` {track.requester.mention}'
-            entries.append(embed)
-
-        await ctx.paginate_embeds(entries=entries)
+        await ctx.paginate_embeds(page_fetcher=lambda page: [self.track_embed(ctx, track=history[page], index=page, total=len(history), location='queue history')],
+                                  total_entries=len(history))
 
     @queue_history.command(name='clear', aliases=['c'])
     async def queue_history_clear(self, ctx: context.Context) -> None:
@@ -553,12 +588,12 @@ class Music(commands.Cog):
         ctx.voice_client.queue.set_looping(looping=not ctx.voice_client.queue.is_looping, current=True)
         await ctx.send(f'I will {"start" if ctx.voice_client.queue.is_looping else "stop"} looping the current track.')
 
-    @queue.command(name='sort')
-    async def queue_sort(self, ctx: context.Context, method: Literal['title', 'length', 'author'], reverse: bool = False) -> None:
+    @queue.group(name='sort', invoke_without_command=True)
+    async def queue_sort(self, ctx: context.Context, methods: commands.Greedy[Literal['title', 'length', 'author']], reverse: bool = False) -> None:
         """
-        Sorts the queue.
+        Sorts the queue and keeps it sorted as tracks are added.
 
-        `method`: The method to sort the queue with. Can be `title`, `length` or `author`.
+        `methods`: The methods to sort the queue with, in order of priority. Can be any of `title`, `length` or `author`, for example `author length`.
         `reverse`: Whether or not to reverse the sort, as in `5, 3, 2, 4, 1` -> `5, 4, 3, 2, 1` instead of `5, 3, 2, 4, 1` -> `1, 2, 3, 4, 5`.
         """
 
@@ -569,17 +604,32 @@ class Music(commands.Cog):
         if not channel or channel.id != ctx.voice_client.channel.id:
             raise exceptions.VoiceError(f'You must be connected to the same voice channel as me to use this command.')
 
-        if ctx.voice_client.queue.is_empty:
-            raise exceptions.VoiceError('The players queue is empty.')
+        if not methods:
+            raise exceptions.ArgumentError('You must choose at least one method to sort the queue with. Can be any of `title`, `length` or `author`.')
+
+        methods = list(dict.fromkeys(methods))
+        ctx.voice_client.queue.set_sorting(methods=methods, reverse=reverse)
+
+        await ctx.send(f'The queue has been sorted with method(s) {", ".join(f"`{method}`" for method in methods)} and will stay sorted as tracks are added.')
+
+    @queue_sort.command(name='off', aliases=['stop'])
+    async def queue_sort_off(self, ctx: context.Context) -> None:
+        """
+        Stops keeping the queue sorted, new tracks will be added to the end of the queue again.
+        """
 
-        if method == 'title':
-            ctx.voice_client.queue._queue.sort(key=lambda track: track.title, reverse=reverse)
-        elif method == 'author':
-            ctx.voice_client.queue._queue.sort(key=lambda track: track.author, reverse=reverse)
-        elif method == 'length':
-            ctx.voice_client.queue._queue.sort(key=lambda track: track.length, reverse=reverse)
+        if not ctx.voice_client or not ctx.voice_client.is_connected:
+            raise exceptions.VoiceError('I am not connected to any voice channels.')
+
+        channel = getattr(ctx.author.voice, 'channel', None)
+        if not channel or channel.id != ctx.voice_client.channel.id:
+            raise exceptions.VoiceError(f'You must be connected to the same voice channel as me to use this command.')
 
-        await ctx.send(f'The queue has been sorted with method `{method}`.')
+        if not ctx.voice_client.queue.is_sorted:
+            raise exceptions.VoiceError('The queue is not being kept sorted.')
+
+        ctx.voice_client.queue.set_sorting(methods=None)
+        await ctx.send('The queue will no longer be kept sorted.')
 
     @queue.command(name='remove')
     async def queue_remove(self, ctx: context.Context, entry: int = 0) -> None:
@@ -602,7 +652,7 @@ class Music(commands.Cog):
         if entry <= 0 or entry > len(ctx.voice_client.queue):
             raise exceptions.VoiceError(f'That was not a valid track entry. Choose a number between `1` and `{len(ctx.voice_client.queue)}` ')
 
-        item = await ctx.voice_client.queue.get(position=entry - 1, put_history=False)
+        item = ctx.voice_client.queue.get(position=entry - 1, put_history=False)
         await ctx.send(f'Removed `{item.title}` from the queue.')
 
     @queue.command(name='move')
@@ -630,8 +680,7 @@ class Music(commands.Cog):
         if entry_2 <= 0 or entry_2 > len(ctx.voice_client.queue):
             raise exceptions.VoiceError(f'That was not a valid track entry to move too. Choose a number between `1` and `{len(ctx.voice_client.queue)}` ')
 
-        track = ctx.voice_client.queue.get(position=entry_1 - 1, put_history=False)
-        ctx.voice_client.queue.put(items=track, position=entry_2 - 1)
+        track = ctx.voice_client.queue.move(position=entry_1 - 1, new_position=entry_2 - 1)
         await ctx.send(f'Moved `{track.title}` from position `{entry_1}` to position `{entry_2}`.')
 
     @commands.command(name='lyrics')
@@ -655,7 +704,7 @@ class Music(commands.Cog):
             query = f'{ctx.voice_client.current.title} - {ctx.voice_client.current.requester}'
 
         try:
-            results = await self.ksoft.music.lyrics(query=query, limit=20)
+            results = await self.lyrics_cache.search(query=query)
         except ksoftapi.NoResults:
             raise exceptions.ArgumentError(f'No results were found for the query `{query}`.')
         except ksoftapi.APIError:
@@ -680,21 +729,7 @@ class Music(commands.Cog):
         await paginator.stop()
         result = results[response]
 
-        entries = []
-        for line in result.lyrics.split('\n'):
-
-            if not entries:
-                entries.append(line)
-                continue
-
-            last_entry = entries[-1]
-            if len(last_entry) >= 1000 or len(last_entry) + len(line) >= 1000:
-                entries.append(line)
-                continue
-
-            entries[-1] += f'\n{line}'
-
-        await ctx.paginate_embed(entries=entries, header=f'Lyrics for `{result.name}` by `{result.artist}`:\n\n', embed_add_footer='Lyrics provided by KSoft.Si API.', per_page=1)
+        await ctx.paginate_embed(entries=self.lyrics_cache.get_pages(result), header=f'Lyrics for `{result.name}` by `{result.artist}`:\n\n', embed_add_footer='Lyrics provided by KSoft.Si API.', per_page=1)
 
 
 def setup(bot: Life):
@@ -22,6 +22,7 @@ class Config:
         self.ksoft_token = ''
         self.wolframalpha_token = ''
         self.idevision_key = ''
+        self.axelweb_token = ''
         self.spotify_app_id = ''
         self.spotify_secret = ''
 
@@ -75,6 +76,78 @@ class Config:
             'db': 0,
         }
 
+        self.music = {
+            'prefetch': 5,
+            'prefetch_concurrency': 3,
+            'spotify_page_concurrency': 4,
+            'import_progress_interval': 5,
+            'history_size': 250,
+            'snapshot_interval': 30,
+            'snapshot_ttl': 3600,
+            'node_balance_interval': 60,
+            'migration_penalty': 250,
+            'migration_margin': 100,
+            'max_migrations': 2,
+            'lyrics_cache_size': 500,
+            'lyrics_cache_ttl': 21600,
+            'search_cache_size': 1000,
+            'search_cache_ttl': 3600,
+            'search_cache_redis': True,
+            'spotify_mapping_cache_size': 10000,
+        }
+
+        self.imaging = {
+            'workers': 4,
+            'reserved_workers': 1,
+            'cheap_cost': 1.0,
+        }
+
+        self.media = {
+            'backend': 'remote',
+            'attachment_limit': 8388608,
+            'concurrency': 4,
+            'retries': 2,
+            'timeout': 30,
+            'path': 'media',
+            'url': '',
+            'ttl': 86400,
+            'max_bytes': 1073741824,
+            'prune_interval': 600,
+            'serve': False,
+            'host': '',
+            'port': 0,
+        }
+
+        self.reminders = {
+            'horizon': 3600,
+            'sweep_interval': 1800,
+            'archive_interval': 3600,
+            'archive_after': 300,
+            'archive_batch_size': 1000,
+            'delivery_concurrency': 5,
+            'delivery_window': 1,
+            'delivery_retries': 5,
+            'delivery_retry_delay': 30,
+            'catch_up_window': 604800,
+            'catch_up_batch_size': 50,
+            'catch_up_delay': 5,
+        }
+
+        self.timecards = {
+            'avatar_cache_size': 2000,
+            'avatar_cache_bytes': 33554432,
+            'avatar_concurrency': 8,
+            'timecard_cache_size': 20,
+            'timecard_cache_bytes': 268435456,
+        }
+
+        self.errors = {
+            'batch_interval': 10,
+            'max_pending': 50,
+            'dedupe_window': 300,
+            'send_delay': 1,
+        }
+
         self.ip = ''
         self.port = 0
 
@@ -10,90 +10,411 @@
 #  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
 #
 
+import asyncio
+import collections
+import heapq
 import logging
 import typing
 
-import aioscheduler
 import discord
 import pendulum
+from discord.ext import tasks
 
 from utilities import context, objects
 
 log = logging.getLogger(__name__)
 
+EMBED_LIMIT = 2048
+EMBED_REMINDERS = 10
+
 
 class ReminderManager:
 
     def __init__(self, bot) -> None:
         self.bot = bot
 
-        self.scheduler = aioscheduler.TimedScheduler()
+        self.reminders = {}
+
+        self.heap = []
+        self.scheduled = {}
+        self.retry_at = {}
+        self.attempts = {}
+        self.loaded_until = None
+
+        self.wakeup = asyncio.Event()
+        self.task = None
+
+        self.semaphore = asyncio.Semaphore(self.bot.config.reminders['delivery_concurrency'])
+
+        self.sweep_reminders.change_interval(seconds=self.bot.config.reminders['sweep_interval'])
+        self.archive_reminders.change_interval(seconds=self.bot.config.reminders['archive_interval'])
 
     async def load(self) -> None:
 
-        self.scheduler.start()
+        await self.migrate()
 
-        reminders = await self.bot.db.fetch('SELECT * FROM reminders order by datetime')
-        for reminder in reminders:
+        now = pendulum.now(tz='UTC')
 
-            user_config = self.bot.user_manager.get_user_config(user_id=reminder['user_id'])
-            if isinstance(user_config, objects.DefaultUserConfig):
-                user_config = await self.bot.user_manager.create_user_config(user_id=reminder['user_id'])
+        self.loaded_until = now
+        self.bot.loop.create_task(self.catch_up(until=now))
 
-            reminder = objects.Reminder(data=dict(reminder))
+        count = await self.sweep()
 
-            if not reminder.done:
-                await self.schedule_reminder(reminder=reminder)
+        log.info(f'[REMINDER MANAGER] Loaded REMINDERS. [{count} reminders]')
+        print(f'[REMINDER MANAGER] Loaded REMINDERS. [{count} reminders]')
 
-            user_config.reminders.append(reminder)
+        self.task = self.bot.loop.create_task(self.run())
+        self.sweep_reminders.start()
+        self.archive_reminders.start()
 
-        log.info(f'[REMINDER MANAGER] Loaded REMINDERS. [{len(reminders)} reminders]')
-        print(f'[REMINDER MANAGER] Loaded REMINDERS. [{len(reminders)} reminders]')
+    async def migrate(self) -> None:
 
-    async def do_reminder(self, *, reminder: objects.Reminder) -> None:
+        async with self.bot.db.acquire() as db:
+            async with db.transaction():
 
-        person = self.bot.get_user(reminder.user_id)
-        if not person:
-            return
+                exists = await db.fetchval('SELECT true FROM information_schema.columns WHERE table_name = \'reminders\' AND column_name = \'delivered\'')
+                if not exists:
+                    await db.execute('ALTER TABLE reminders ADD COLUMN delivered boolean NOT NULL DEFAULT false')
+                    await db.execute('UPDATE reminders SET delivered = true WHERE datetime <= $1', pendulum.now(tz='UTC'))
 
-        user_config = self.bot.user_manager.get_user_config(user_id=reminder.user_id)
-        if isinstance(user_config, objects.DefaultUserConfig):
-            user_config = await self.bot.user_manager.create_user_config(user_id=reminder.user_id)
+                await db.execute('CREATE INDEX IF NOT EXISTS reminders_datetime_idx ON reminders (datetime)')
+                await db.execute('CREATE INDEX IF NOT EXISTS reminders_user_id_idx ON reminders (user_id, datetime)')
+                await db.execute('CREATE INDEX IF NOT EXISTS reminders_undelivered_idx ON reminders (datetime, id) WHERE delivered = false')
+
+                await db.execute('CREATE TABLE IF NOT EXISTS reminders_archive (LIKE reminders)')
+                await db.execute('ALTER TABLE reminders_archive ADD COLUMN IF NOT EXISTS delivered boolean NOT NULL DEFAULT true')
+
+    #
+
+    async def sweep(self) -> int:
+
+        start = self.loaded_until
+        end = pendulum.now(tz='UTC').add(seconds=self.bot.config.reminders['horizon'])
+
+        reminders = await self.bot.db.fetch('SELECT * FROM reminders WHERE datetime > $1 AND datetime <= $2 order by datetime', start, end)
+        for data in reminders:
+
+            if data['id'] in self.reminders:
+                continue
+
+            reminder = objects.Reminder(data=dict(data))
+
+            self.add_reminder(reminder=reminder)
+            self.schedule_reminder(reminder=reminder)
+
+        self.loaded_until = end
+        log.info(f'[REMINDER MANAGER] Swept reminders due before \'{end}\'. [{len(reminders)} reminders]')
+
+        return len(reminders)
+
+    @tasks.loop(seconds=1800)
+    async def sweep_reminders(self) -> None:
+
+        try:
+            await self.sweep()
+        except Exception as error:
+            log.error(f'[REMINDER MANAGER] Error while sweeping reminders | {error!r}', exc_info=error)
+
+    @sweep_reminders.before_loop
+    async def before_sweep_reminders(self) -> None:
+        await self.bot.wait_until_ready()
+
+    async def archive(self) -> int:
+
+        now = pendulum.now(tz='UTC')
+        cutoff = now.subtract(seconds=self.bot.config.reminders['archive_after'])
+        expired = now.subtract(seconds=self.bot.config.reminders['catch_up_window'])
+        batch_size = self.bot.config.reminders['archive_batch_size']
+        total = 0
+
+        while True:
+
+            data = await self.bot.db.fetchval(
+                '''
+                WITH archived AS (
+                    DELETE FROM reminders WHERE id IN (SELECT id FROM reminders WHERE datetime <= $1 AND (delivered = true OR datetime <= $3) ORDER BY datetime LIMIT $2) RETURNING *
+                ), inserted AS (
+                    INSERT INTO reminders_archive SELECT * FROM archived RETURNING 1
+                )
+                SELECT count(*) FROM inserted
+                ''',
+                cutoff, batch_size, expired
+            )
+
+            total += data
+            if data < batch_size:
+                break
+
+        if total:
+            log.info(f'[REMINDER MANAGER] Archived completed reminders. [{total} reminders]')
+
+        return total
+
+    @tasks.loop(seconds=3600)
+    async def archive_reminders(self) -> None:
+
+        try:
+            await self.archive()
+        except Exception as error:
+            log.error(f'[REMINDER MANAGER] Error while archiving reminders | {error!r}', exc_info=error)
 
-        embed = discord.Embed(colour=user_config.colour,
-                              description=f'**[Reminder]({reminder.link}) - {self.bot.utils.format_difference(datetime=reminder.created_at, suppress=[])} ago**\n\n'
-                                          f'{reminder.content}\n\n'
-                                          f'**Time set:** `{self.bot.utils.format_datetime(datetime=reminder.created_at, seconds=True)}`\n'
-                                          f'**Time to remind at:** `{self.bot.utils.format_datetime(datetime=reminder.datetime, seconds=True)}`')
+    @archive_reminders.before_loop
+    async def before_archive_reminders(self) -> None:
+        await self.bot.wait_until_ready()
 
-        channel = self.bot.get_channel(reminder.channel_id)
+    def close(self) -> None:
+
+        if self.task is not None:
+            self.task.cancel()
+
+        self.sweep_reminders.cancel()
+        self.archive_reminders.cancel()
+
+    async def run(self) -> None:
+
+        while True:
 
-        if reminder.dm or channel is None:
             try:
-                await person.send(content=f'<@!{reminder.user_id}>', embed=embed)
-            except discord.Forbidden:
-                return
+                await self.dispatch()
+            except asyncio.CancelledError:
+                raise
+            except Exception as error:
+                log.error(f'[REMINDER MANAGER] Error in reminder dispatcher | {error!r}', exc_info=error)
+                await asyncio.sleep(1)
+
+    async def dispatch(self) -> None:
+
+        if not self.heap:
+            self.wakeup.clear()
+            await self.wakeup.wait()
+            return
+
+        timestamp, reminder_id = self.heap[0]
 
-        else:
+        reminder = self.scheduled.get(reminder_id)
+        if reminder is None or self.due_at(reminder=reminder) != timestamp:
+            heapq.heappop(self.heap)
+            return
 
+        if (delay := timestamp - pendulum.now(tz='UTC').timestamp()) > 0:
+            self.wakeup.clear()
             try:
-                await channel.send(content=f'<@!{reminder.user_id}>', embed=embed)
-            except discord.Forbidden:
+                await asyncio.wait_for(self.wakeup.wait(), timeout=delay)
+            except asyncio.TimeoutError:
+                pass
+            return
+
+        now = pendulum.now(tz='UTC').timestamp() + self.bot.config.reminders['delivery_window']
+        due = []
+
+        while self.heap and self.heap[0][0] <= now:
+
+            timestamp, reminder_id = heapq.heappop(self.heap)
+
+            reminder = self.scheduled.get(reminder_id)
+            if reminder is None or self.due_at(reminder=reminder) != timestamp:
+                continue
+
+            del self.scheduled[reminder_id]
+            self.retry_at.pop(reminder_id, None)
+            self.remove_reminder(reminder=reminder)
+            due.append(reminder)
+
+        self.bot.loop.create_task(self.deliver(reminders=due))
+
+    #
+
+    def reminder_description(self, *, reminder: objects.Reminder) -> str:
+
+        return f'**[Reminder]({reminder.link}) - {self.bot.utils.format_difference(datetime=reminder.created_at, suppress=[])} ago**\n\n' \
+               f'{reminder.content}\n\n' \
+               f'**Time set:** `{self.bot.utils.format_datetime(datetime=reminder.created_at, seconds=True)}`\n' \
+               f'**Time to remind at:** `{self.bot.utils.format_datetime(datetime=reminder.datetime, seconds=True)}`'
+
+    def reminder_colour(self, *, user_id: int) -> discord.Colour:
+        return self.bot.user_manager.get_user_config(user_id=user_id).colour
+
+    async def deliver(self, *, reminders: typing.List[objects.Reminder]) -> None:
+
+        channels = collections.defaultdict(list)
+        direct = []
+        handled = []
+
+        for reminder in reminders:
+
+            if not self.bot.get_user(reminder.user_id):
+                handled.append(reminder.id)
+                continue
+
+            channel = self.bot.get_channel(reminder.channel_id)
+            if reminder.dm or channel is None:
+                direct.append(reminder)
+            else:
+                channels[channel].append(reminder)
+
+        if len(reminders) > 1:
+            log.info(f'[REMINDER MANAGER] Delivering reminders. [{len(reminders)} reminders | {len(channels)} channels | {len(direct)} direct messages]')
+
+        results = await asyncio.gather(
+            *(self.send_to_channel(channel=channel, reminders=channel_reminders) for channel, channel_reminders in channels.items()),
+            *(self.send_to_users(reminders=[reminder]) for reminder in direct)
+        )
+
+        for ids in results:
+            handled.extend(ids)
+
+        delivered = set(handled)
+        for reminder_id in delivered:
+            self.attempts.pop(reminder_id, None)
+
+        if failed := [reminder for reminder in reminders if reminder.id not in delivered]:
+            self.retry_reminders(reminders=failed)
+
+        await self.mark_delivered(reminder_ids=handled)
+
+    def retry_reminders(self, *, reminders: typing.List[objects.Reminder]) -> None:
+
+        now = pendulum.now(tz='UTC').timestamp()
+
+        for reminder in reminders:
+
+            attempt = self.attempts.get(reminder.id, 0) + 1
+
+            if attempt > self.bot.config.reminders['delivery_retries']:
+                self.attempts.pop(reminder.id, None)
+                log.warning(f'[REMINDER MANAGER] Gave up delivering reminder with id \'{reminder.id}\' after {attempt - 1} attempts, it will be caught up on the next start.')
+                continue
+
+            self.attempts[reminder.id] = attempt
+            self.retry_at[reminder.id] = now + self.bot.config.reminders['delivery_retry_delay'] * 2 ** (attempt - 1)
+
+            self.add_reminder(reminder=reminder)
+            self.schedule_reminder(reminder=reminder)
+
+    async def mark_delivered(self, *, reminder_ids: typing.List[int]) -> None:
+
+        if not reminder_ids:
+            return
+
+        await self.bot.db.execute('UPDATE reminders SET delivered = true WHERE id = ANY($1) AND delivered = false', reminder_ids)
+
+    async def send_to_users(self, *, reminders: typing.List[objects.Reminder]) -> typing.List[int]:
+
+        handled = []
+
+        for reminder in reminders:
+
+            person = self.bot.get_user(reminder.user_id)
+            embed = discord.Embed(colour=self.reminder_colour(user_id=reminder.user_id), description=self.reminder_description(reminder=reminder))
+
+            async with self.semaphore:
                 try:
                     await person.send(content=f'<@!{reminder.user_id}>', embed=embed)
                 except discord.Forbidden:
-                    return
+                    pass
+                except discord.HTTPException:
+                    continue
+
+            handled.append(reminder.id)
+
+        return handled
+
+    async def send_to_channel(self, *, channel: discord.TextChannel, reminders: typing.List[objects.Reminder]) -> typing.List[int]:
+
+        groups = []
+        length = 0
+
+        for reminder in reminders:
+
+            description = self.reminder_description(reminder=reminder)
+
+            if groups and len(groups[-1]) < EMBED_REMINDERS and length + len(description) + 2 <= EMBED_LIMIT:
+                groups[-1].append((reminder, description))
+                length += len(description) + 2
+            else:
+                groups.append([(reminder, description)])
+                length = len(description)
+
+        handled = []
+        forbidden = []
+
+        async with self.semaphore:
+            for group in groups:
+
+                mentions = ' '.join(dict.fromkeys(f'<@!{reminder.user_id}>' for reminder, _ in group))
+                embed = discord.Embed(colour=self.reminder_colour(user_id=group[0][0].user_id), description='\n\n'.join(description for _, description in group))
+
+                try:
+                    await channel.send(content=mentions, embed=embed)
+                except discord.Forbidden:
+                    forbidden.extend(reminder for reminder, _ in group)
+                    continue
+                except discord.HTTPException:
+                    continue
+
+                handled.extend(reminder.id for reminder, _ in group)
+
+        if forbidden:
+            handled.extend(await self.send_to_users(reminders=forbidden))
+
+        return handled
+
+    async def catch_up(self, *, until: pendulum.DateTime) -> None:
+
+        batch_size = self.bot.config.reminders['catch_up_batch_size']
+        last = (pendulum.now(tz='UTC').subtract(seconds=self.bot.config.reminders['catch_up_window']), 0)
+        total = 0
+
+        while True:
+
+            data = await self.bot.db.fetch(
+                'SELECT * FROM reminders WHERE delivered = false AND (datetime, id) > ($1, $2) AND datetime <= $3 ORDER BY datetime, id LIMIT $4',
+                *last, until, batch_size
+            )
+            if not data:
+                break
+
+            reminders = [objects.Reminder(data=dict(reminder)) for reminder in data]
+            await self.deliver(reminders=reminders)
+
+            total += len(reminders)
+            last = (data[-1]['datetime'], data[-1]['id'])
+
+            if len(data) < batch_size:
+                break
+
+            await asyncio.sleep(self.bot.config.reminders['catch_up_delay'])
+
+        if total:
+            log.info(f'[REMINDER MANAGER] Delivered missed reminders. [{total} reminders]')
+
+    def due_at(self, *, reminder: objects.Reminder) -> float:
+        return self.retry_at.get(reminder.id, reminder.datetime.timestamp())
 
-    async def schedule_reminder(self, *, reminder: objects.Reminder) -> None:
+    def schedule_reminder(self, *, reminder: objects.Reminder) -> None:
 
-        reminder.task = self.scheduler.schedule(self.do_reminder(reminder=reminder), when=reminder.datetime.naive())
-        log.info(f'[REMINDER MANAGER] Scheduled reminder with id \'{reminder.id}\' for \'{reminder.datetime}\'')
+        if reminder.id in self.scheduled:
+            return
+
+        self.scheduled[reminder.id] = reminder
+        heapq.heappush(self.heap, (self.due_at(reminder=reminder), reminder.id))
+
+        if self.heap[0][1] == reminder.id:
+            self.wakeup.set()
+
+        log.info(f'[REMINDER MANAGER] Scheduled reminder with id \'{reminder.id}\' for \'{pendulum.from_timestamp(self.due_at(reminder=reminder))}\'')
+
+    def add_reminder(self, *, reminder: objects.Reminder) -> None:
+        self.reminders[reminder.id] = reminder
+
+    def remove_reminder(self, *, reminder: objects.Reminder) -> None:
+        self.reminders.pop(reminder.id, None)
 
     async def create_reminder(self, *, user_id: int, datetime: pendulum.datetime, content: str, ctx: context.Context, dm: bool = False) -> objects.Reminder:
 
         user_config = self.bot.user_manager.get_user_config(user_id=user_id)
         if isinstance(user_config, objects.DefaultUserConfig):
-            user_config = await self.bot.user_manager.create_user_config(user_id=user_id)
+            await self.bot.user_manager.create_user_config(user_id=user_id)
 
         query = 'INSERT INTO reminders (user_id, datetime, created_at, content, link, channel_id, message_id, dm) VALUES ($1, $2, $3, $4, $5, $6, $7, $8) RETURNING *'
         data = await self.bot.db.fetchrow(query, user_id, datetime, pendulum.now(tz='UTC'), content, ctx.message.jump_url, ctx.channel.id, ctx.message.id, dm)
@@ -101,37 +422,28 @@ class ReminderManager:
 
         reminder = objects.Reminder(data=dict(data))
 
-        if not reminder.done:
-            await self.schedule_reminder(reminder=reminder)
+        if self.loaded_until is not None and reminder.datetime <= self.loaded_until:
+            self.add_reminder(reminder=reminder)
+            self.schedule_reminder(reminder=reminder)
 
-        user_config.reminders.append(reminder)
         return reminder
 
-    async def get_reminder(self, *, user_id: int, reminder_id: int) -> typing.Optional[objects.Reminder]:
+    async def get_reminders(self, *, user_id: int) -> typing.List[objects.Reminder]:
 
-        user_config = self.bot.user_manager.get_user_config(user_id=user_id)
-        if isinstance(user_config, objects.DefaultUserConfig):
-            user_config = await self.bot.user_manager.create_user_config(user_id=user_id)
+        data = await self.bot.db.fetch('SELECT * FROM reminders WHERE user_id = $1 AND datetime > $2 ORDER BY datetime', user_id, pendulum.now(tz='UTC'))
+        return [self.reminders.get(reminder['id']) or objects.Reminder(data=dict(reminder)) for reminder in data]
 
-        reminders = [reminder for reminder in user_config.reminders if reminder.id == reminder_id]
-        if not reminders:
-            return
-
-        return reminders[0]
+    async def delete_reminders(self, *, user_id: int, reminder_ids: typing.List[int]) -> typing.List[int]:
 
-    async def delete_reminder(self, user_id: int, reminder_id: int) -> None:
-
-        user_config = self.bot.user_manager.get_user_config(user_id=user_id)
-        if isinstance(user_config, objects.DefaultUserConfig):
-            user_config = await self.bot.user_manager.create_user_config(user_id=user_id)
-
-        reminders = [reminder for reminder in user_config.reminders if reminder.id == reminder_id]
-        if not reminders:
-            return
+        data = await self.bot.db.fetch('DELETE FROM reminders WHERE id = ANY($1) AND user_id = $2 RETURNING id', list(set(reminder_ids)), user_id)
+        ids = [reminder['id'] for reminder in data]
 
-        reminder = reminders[0]
-        if reminder.task:
-            self.scheduler.cancel(reminder.task)
+        for reminder_id in ids:
+            self.scheduled.pop(reminder_id, None)
+            self.retry_at.pop(reminder_id, None)
+            self.attempts.pop(reminder_id, None)
+            if (reminder := self.reminders.get(reminder_id)) is not None:
+                self.remove_reminder(reminder=reminder)
 
-        await self.bot.db.execute('DELETE FROM reminders WHERE id = $1', reminder.id)
-        user_config.reminders.remove(reminder)
+        log.info(f'[REMINDER MANAGER] Deleted reminders with ids \'{ids}\' for user with id \'{user_id}\'')
+        return ids
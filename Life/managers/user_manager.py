@@ -10,6 +10,8 @@
 #  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
 #
 
+import asyncio
+import functools
 import io
 import logging
 import math
@@ -23,11 +25,137 @@ from PIL import Image, ImageDraw, ImageFont
 from discord.ext import tasks
 
 from managers import reminder_manager
-from utilities import exceptions, objects
+from utilities import cache, exceptions, objects
 from utilities.enums import Editables, Operations
 
 log = logging.getLogger(__name__)
 
+DEFAULT_BIRTHDAY = pendulum.DateTime(2020, 1, 1, 0, 0, 0, tzinfo=pendulum.timezone('UTC'))
+BIRTHDAY_DAYS = [(day.month, day.day) for day in (pendulum.date(2020, 1, 1).add(days=offset) for offset in range(366))]
+
+TIMECARD_AVATARS = 36
+TIMECARD_AVATAR_SIZE = 250
+
+
+def avatar_key(user: discord.abc.User) -> typing.Tuple[typing.Any, typing.Any]:
+    return (user.id, user.avatar) if user.avatar else ('default', user.default_avatar.value)
+
+
+def resize_avatar(data: bytes) -> bytes:
+
+    with Image.open(io.BytesIO(data)) as image:
+        image = image.convert('RGBA').resize((TIMECARD_AVATAR_SIZE, TIMECARD_AVATAR_SIZE))
+
+    avatar = Image.new('RGB', image.size, color='#f1c30f')
+    avatar.paste(image, mask=image)
+
+    buffer = io.BytesIO()
+    avatar.save(buffer, 'jpeg', quality=85)
+
+    image.close()
+    avatar.close()
+
+    return buffer.getvalue()
+
+
+@functools.lru_cache(maxsize=None)
+def timecard_font() -> ImageFont.FreeTypeFont:
+    return ImageFont.truetype(os.path.abspath(os.path.join(os.path.dirname(__file__), '../resources/arial.ttf')), 120)
+
+
+def create_timecard_tile(avatars: typing.List[bytes]) -> bytes:
+
+    tile = Image.new('RGB', (1500, 1500), color='#f1c30f')
+
+    x = 0
+    y = 0
+
+    for avatar in avatars:
+
+        with Image.open(io.BytesIO(avatar)) as avatar_image:
+            tile.paste(avatar_image, (x, y))
+
+        if x < 1200:
+            x += 250
+        else:
+            y += 250
+            x = 0
+
+    buffer = io.BytesIO()
+    tile.save(buffer, 'jpeg', quality=90)
+    tile.close()
+
+    return buffer.getvalue()
+
+
+def timecard_position(index: int) -> typing.Tuple[int, int]:
+    return 100 + 1600 * (index % 5), 100 + 1800 * (index // 5)
+
+
+def create_timecard_canvas(tiles: typing.List[bytes]) -> Image.Image:
+
+    width_x = (1600 * (len(tiles) if len(tiles) < 5 else 5)) + 100
+    height_y = (1800 * math.ceil(len(tiles) / 5)) + 100
+
+    canvas = Image.new('RGB', (width_x, height_y), color='#f1c30f')
+
+    for index, tile in enumerate(tiles):
+
+        x, y = timecard_position(index)
+
+        with Image.open(io.BytesIO(tile)) as tile_image:
+            canvas.paste(tile_image, (x, y + 200))
+
+    return canvas
+
+
+def draw_timecard_headers(canvas: Image.Image, labels: typing.List[str], previous: typing.List[typing.Optional[str]]) -> bytes:
+
+    draw = ImageDraw.Draw(canvas)
+    font = timecard_font()
+
+    for index, (label, previous_label) in enumerate(zip(labels, previous)):
+
+        if label == previous_label:
+            continue
+
+        x, y = timecard_position(index)
+
+        draw.rectangle((x, y, x + 1499, y + 199), fill='#f1c30f')
+        draw.text((x, y), label, font=font, fill='#1b1a1c')
+
+    buffer = io.BytesIO()
+    canvas.save(buffer, 'png')
+
+    return buffer.getvalue()
+
+
+class Timecard:
+
+    __slots__ = ('lock', 'tiles', 'layout', 'labels', 'canvas', 'image')
+
+    def __init__(self) -> None:
+
+        self.lock = asyncio.Lock()
+        self.tiles: typing.Dict[typing.Tuple[typing.Any, ...], bytes] = {}
+
+        self.layout: typing.Tuple[typing.Optional[typing.Tuple[typing.Any, ...]], ...] = ()
+        self.labels: typing.List[typing.Optional[str]] = []
+
+        self.canvas: typing.Optional[Image.Image] = None
+        self.image: typing.Optional[bytes] = None
+
+    def __repr__(self) -> str:
+        return f'<Timecard tiles={len(self.tiles)} size={len(self)}>'
+
+    def __len__(self) -> int:
+
+        size = sum(len(tile) for tile in self.tiles.values()) + len(self.image or b'')
+        if self.canvas is not None:
+            size += self.canvas.width * self.canvas.height * 3
+
+        return size
+
 
 class UserConfigManager:
 
@@ -36,6 +164,12 @@ class UserConfigManager:
 
         self.default_user_config = objects.DefaultUserConfig()
         self.configs = {}
+        self.birthdays = {}
+        self.timezones = {}
+
+        self.avatars = cache.TTLCache(max_size=self.bot.config.timecards['avatar_cache_size'], max_bytes=self.bot.config.timecards['avatar_cache_bytes'])
+        self.avatar_semaphore = asyncio.Semaphore(self.bot.config.timecards['avatar_concurrency'])
+        self.timecards = cache.TTLCache(max_size=self.bot.config.timecards['timecard_cache_size'], max_bytes=self.bot.config.timecards['timecard_cache_bytes'])
 
         self.update_database.start()
 
@@ -46,6 +180,8 @@ class UserConfigManager:
         user_configs = await self.bot.db.fetch('SELECT * FROM user_configs')
         for user_config in user_configs:
             self.configs[user_config['id']] = objects.UserConfig(data=dict(user_config))
+            self.index_birthday(user_id=user_config['id'])
+            self.index_timezone(user_id=user_config['id'])
 
         log.info(f'[USER MANAGER] Loaded user configs. [{len(user_configs)} users]')
         print(f'[USER MANAGER] Loaded user configs. [{len(user_configs)} users]')
@@ -82,6 +218,8 @@ class UserConfigManager:
 
         data = await self.bot.db.fetchrow('INSERT INTO user_configs (id) values ($1) ON CONFLICT (id) DO UPDATE SET id = excluded.id RETURNING *', user_id)
         self.configs[user_id] = objects.UserConfig(data=dict(data))
+        self.index_birthday(user_id=user_id)
+        self.index_timezone(user_id=user_id)
 
         log.info(f'[USER MANAGER] Created config for user with id \'{user_id}\'')
         return self.configs[user_id]
@@ -128,7 +266,12 @@ class UserConfigManager:
             }
 
             data = await self.bot.db.fetchrow(*operations[operation.value])
+
+            self.unindex_timezone(user_id=user_id)
             user_config.timezone = pendulum.timezone(data['timezone'])
+            self.index_timezone(user_id=user_id)
+
+            self.invalidate_timecards(user_id=user_id)
 
         elif editable == Editables.timezone_private:
 
@@ -140,6 +283,8 @@ class UserConfigManager:
             data = await self.bot.db.fetchrow(*operations[operation.value])
             user_config.timezone_private = data['timezone_private']
 
+            self.invalidate_timecards(user_id=user_id)
+
         elif editable == Editables.xp:
 
             if operation.value == 'add':
@@ -204,7 +349,10 @@ class UserConfigManager:
             }
 
             data = await self.bot.db.fetchrow(*operations[operation.value])
+
+            self.unindex_birthday(user_id=user_id)
             user_config.birthday = pendulum.parse(data['birthday'].isoformat(), tz='UTC')
+            self.index_birthday(user_id=user_id)
 
         elif editable == Editables.birthday_private:
 
@@ -220,6 +368,58 @@ class UserConfigManager:
 
     #
 
+    def index_birthday(self, *, user_id: int) -> None:
+
+        birthday = self.configs[user_id].birthday
+        if birthday == DEFAULT_BIRTHDAY:
+            return
+
+        self.birthdays.setdefault((birthday.month, birthday.day), set()).add(user_id)
+
+    def unindex_birthday(self, *, user_id: int) -> None:
+
+        birthday = self.configs[user_id].birthday
+        key = (birthday.month, birthday.day)
+
+        if (user_ids := self.birthdays.get(key)) is None:
+            return
+
+        user_ids.discard(user_id)
+        if not user_ids:
+            del self.birthdays[key]
+
+    def upcoming_birthdays(self, *, guild: discord.Guild, limit: int) -> typing.List[typing.Tuple[discord.Member, objects.UserConfig]]:
+
+        today = pendulum.now(tz='UTC')
+        start = BIRTHDAY_DAYS.index((today.month, today.day))
+
+        birthdays = []
+
+        for offset in range(1, len(BIRTHDAY_DAYS) + 1):
+
+            user_ids = self.birthdays.get(BIRTHDAY_DAYS[(start + offset) % len(BIRTHDAY_DAYS)])
+            if not user_ids:
+                continue
+
+            for user_id in sorted(user_ids):
+
+                user_config = self.configs[user_id]
+                if user_config.birthday_private:
+                    continue
+
+                member = guild.get_member(user_id)
+                if not member:
+                    continue
+
+                birthdays.append((member, user_config))
+
+            if len(birthdays) >= limit:
+                break
+
+        return birthdays[:limit]
+
+    #
+
     async def add_xp(self, *, user_id: int) -> None:
 
         if await self.bot.redis.exists(f'{user_id}_xp_gain') is True:
@@ -239,84 +439,128 @@ class UserConfigManager:
 
     #
 
+    def index_timezone(self, *, user_id: int) -> None:
+        self.timezones.setdefault(self.configs[user_id].timezone.name, set()).add(user_id)
+
+    def unindex_timezone(self, *, user_id: int) -> None:
+
+        timezone = self.configs[user_id].timezone.name
+
+        if (user_ids := self.timezones.get(timezone)) is None:
+            return
+
+        user_ids.discard(user_id)
+        if not user_ids:
+            del self.timezones[timezone]
+
+    def guild_timezones(self, *, guild: discord.Guild) -> typing.Dict[str, typing.List[discord.Member]]:
+
+        zones = {}
+        member_ids = {member.id for member in guild.members}
+
+        for timezone, user_ids in self.timezones.items():
+
+            if timezone == 'UTC':
+                continue
+
+            if members := [guild.get_member(user_id) for user_id in sorted(user_ids & member_ids) if not self.configs[user_id].timezone_private]:
+                zones[timezone] = members
+
+        return zones
+
+    #
+
+    async def fetch_avatar(self, *, key: typing.Tuple[typing.Any, typing.Any], user: discord.Member) -> typing.Optional[bytes]:
+
+        if (avatar := self.avatars.get(key)) is not None:
+            return avatar
+
+        async with self.avatar_semaphore:
+            try:
+                data = await user.avatar_url_as(format='png', size=256).read()
+            except discord.HTTPException:
+                return None
+
+        avatar = await self.bot.loop.run_in_executor(None, resize_avatar, data)
+        self.avatars.put(key, avatar)
+
+        return avatar
+
     async def create_timecard(self, *, guild_id: int) -> io.BytesIO:
 
         guild = self.bot.get_guild(guild_id)
         if not guild:
             raise exceptions.ArgumentError('Guild with that id not found.')
 
-        configs = sorted(self.configs.items(), key=lambda kv: kv[1].time.offset_hours)
-        timezone_users = {}
+        zones = self.guild_timezones(guild=guild)
 
-        for user_id, config in configs:
+        if not zones:
+            raise exceptions.ArgumentError('There are no users with timezones set in this server.')
 
-            if config.timezone_private or config.timezone == pendulum.timezone('UTC'):
-                continue
+        groups = {}
 
-            user = guild.get_member(user_id)
-            if not user:
-                continue
+        for zone, users in zones.items():
+            now = pendulum.now(tz=zone)
+            groups.setdefault((now.offset, now.format('HH:mm (ZZ)')), []).extend(users)
 
-            if timezone_users.get(config.time.format('HH:mm (ZZ)')) is None:
-                timezone_users[config.time.format('HH:mm (ZZ)')] = [io.BytesIO(await user.avatar_url_as(format='png', size=256).read())]
+        timezone_users = {label: users[:TIMECARD_AVATARS] for (_, label), users in sorted(groups.items())}
+        tile_keys = {label: tuple(avatar_key(user) for user in users) for label, users in timezone_users.items()}
 
-            else:
-                timezone_users[config.time.format('HH:mm (ZZ)')].append(io.BytesIO(await user.avatar_url_as(format='png', size=256).read()))
+        if (timecard := self.timecards.get(guild_id)) is None:
+            timecard = Timecard()
+            self.timecards.put(guild_id, timecard)
 
-        if not timezone_users:
-            raise exceptions.ArgumentError('There are no users with timezones set in this server.')
+        layout = tuple(tile_keys.values())
+        labels = list(tile_keys)
 
-        buffer = await self.bot.loop.run_in_executor(None, self.create_timecard_image, timezone_users)
-        return buffer
+        async with timecard.lock:
 
-    def create_timecard_image(self, timezone_users: dict) -> io.BytesIO:
+            if layout != timecard.layout:
 
-        width_x = (1600 * (len(timezone_users.keys()) if len(timezone_users.keys()) < 5 else 5)) + 100
-        height_y = (1800 * math.ceil(len(timezone_users.keys()) / 5)) + 100
+                tiles = {tile_key: tile for tile_key in layout if (tile := timecard.tiles.get(tile_key)) is not None}
+                missing = {label: users for label, users in timezone_users.items() if tile_keys[label] not in tiles}
 
-        image = Image.new('RGBA', (width_x, height_y), color='#f1c30f')
-        draw = ImageDraw.Draw(image)
-        font = ImageFont.truetype(os.path.abspath(os.path.join(os.path.dirname(__file__), '../resources/arial.ttf')), 120)
+                keys = {avatar_key(user): user for users in missing.values() for user in users}
+                avatars = dict(zip(keys, await asyncio.gather(*(self.fetch_avatar(key=key, user=user) for key, user in keys.items()))))
 
-        x = 100
-        y = 100
+                incomplete = set()
 
-        for timezone, users in timezone_users.items():
+                for label, users in missing.items():
 
-            draw.text((x, y), timezone, font=font, fill='#1b1a1c')
+                    thumbnails = [avatar for user in users if (avatar := avatars[avatar_key(user)]) is not None]
+                    if len(thumbnails) < len(users):
+                        incomplete.add(tile_keys[label])
 
-            user_x = x
-            user_y = y + 200
+                    tiles[tile_keys[label]] = await self.bot.loop.run_in_executor(None, create_timecard_tile, thumbnails)
 
-            for user in users[:36]:
+                canvas = await self.bot.loop.run_in_executor(None, create_timecard_canvas, [tiles[tile_key] for tile_key in layout])
 
-                avatar = Image.open(user)
-                avatar = avatar.resize((250, 250))
+                if timecard.canvas is not None:
+                    timecard.canvas.close()
 
-                image.paste(avatar, (user_x, user_y))
+                timecard.canvas = canvas
+                timecard.tiles = {tile_key: tile for tile_key, tile in tiles.items() if tile_key not in incomplete}
+                timecard.layout = tuple(None if tile_key in incomplete else tile_key for tile_key in layout)
+                timecard.labels = [None] * len(layout)
 
-                if user_x < x + 1200:
-                    user_x += 250
-                else:
-                    user_y += 250
-                    user_x = x
+            if labels != timecard.labels:
+                timecard.image = await self.bot.loop.run_in_executor(None, draw_timecard_headers, timecard.canvas, labels, timecard.labels)
+                timecard.labels = labels
 
-            if x > 6400:
-                y += 1800
-                x = 100
-            else:
-                x += 1600
+            image = timecard.image
 
-        buffer = io.BytesIO()
-        image.save(buffer, 'png')
-        buffer.seek(0)
+        if self.timecards.get(guild_id, count=False) is timecard:
+            self.timecards.put(guild_id, timecard)
 
-        image.close()
-        del image
-        del draw
-        del font
+        return io.BytesIO(image)
 
-        return buffer
+    def invalidate_timecards(self, *, user_id: int) -> None:
+
+        for guild_id in list(self.timecards.entries):
+
+            guild = self.bot.get_guild(guild_id)
+            if not guild or guild.get_member(user_id):
+                self.timecards.pop(guild_id)
 
     #
 
@@ -0,0 +1,91 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import collections
+import time
+import typing
+
+
+class TTLCache:
+
+    __slots__ = ('max_size', 'max_bytes', 'ttl', 'entries', 'bytes', 'hits', 'misses')
+
+    def __init__(self, *, max_size: int, ttl: typing.Optional[float] = None, max_bytes: typing.Optional[int] = None) -> None:
+
+        self.max_size = max_size
+        self.max_bytes = max_bytes
+        self.ttl = ttl
+
+        self.entries: collections.OrderedDict = collections.OrderedDict()
+        self.bytes = 0
+
+        self.hits = 0
+        self.misses = 0
+
+    def __repr__(self) -> str:
+        return f'<TTLCache size={len(self.entries)} max_size={self.max_size} bytes={self.bytes} ttl={self.ttl} hits={self.hits} misses={self.misses}>'
+
+    def __len__(self) -> int:
+        return len(self.entries)
+
+    def __contains__(self, key: typing.Hashable) -> bool:
+        return self.get(key, count=False) is not None
+
+    def get(self, key: typing.Hashable, default: typing.Any = None, *, count: bool = True) -> typing.Any:
+
+        entry = self.entries.get(key)
+
+        if entry is not None and entry[0] is not None and entry[0] < time.monotonic():
+            self.pop(key)
+            entry = None
+
+        if entry is None:
+            if count:
+                self.misses += 1
+            return default
+
+        self.entries.move_to_end(key)
+        if count:
+            self.hits += 1
+
+        return entry[1]
+
+    def put(self, key: typing.Hashable, value: typing.Any, *, ttl: typing.Optional[float] = None) -> None:
+
+        ttl = ttl or self.ttl
+
+        self.pop(key)
+
+        weight = self.weigh(value)
+
+        self.entries[key] = (time.monotonic() + ttl if ttl else None, value, weight)
+        self.bytes += weight
+
+        while len(self.entries) > self.max_size or (self.max_bytes is not None and self.bytes > self.max_bytes and len(self.entries) > 1):
+            self.bytes -= self.entries.popitem(last=False)[1][2]
+
+    def pop(self, key: typing.Hashable, default: typing.Any = None) -> typing.Any:
+
+        entry = self.entries.pop(key, None)
+        if entry is None:
+            return default
+
+        self.bytes -= entry[2]
+        return entry[1]
+
+    def clear(self) -> None:
+
+        self.entries.clear()
+        self.bytes = 0
+
+    def weigh(self, value: typing.Any) -> int:
+        return len(value) if self.max_bytes is not None else 0
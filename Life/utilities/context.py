@@ -99,3 +99,26 @@ class Context(commands.Context):
                 return await self.channel.send(**kwargs)
             except discord.Forbidden:
                 return
+
+
+class PartialContext:
+
+    __slots__ = ('bot', 'guild', 'channel', 'author')
+
+    def __init__(self, *, bot, guild: discord.Guild, channel: typing.Optional[discord.TextChannel], author: typing.Union[discord.Member, discord.User]) -> None:
+
+        self.bot = bot
+        self.guild = guild
+        self.channel = channel
+        self.author = author
+
+    def __repr__(self) -> str:
+        return f'<life.PartialContext guild={self.guild!r} channel={self.channel!r} author={self.author!r}>'
+
+    user_config = Context.user_config
+    guild_config = Context.guild_config
+    colour = Context.colour
+
+    @property
+    def voice_client(self) -> Player:
+        return self.guild.voice_client
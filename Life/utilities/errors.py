@@ -0,0 +1,200 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import asyncio
+import hashlib
+import logging
+import traceback
+import typing
+
+import discord
+import mystbin
+import pendulum
+import prettify_exceptions
+
+from utilities import cache, context
+
+log = logging.getLogger(__name__)
+
+
+def fingerprint(error: BaseException) -> str:
+
+    frames = traceback.extract_tb(error.__traceback__)
+    key = f'{type(error).__module__}.{type(error).__qualname__}|' + '|'.join(f'{frame.filename}:{frame.lineno}:{frame.name}' for frame in frames)
+
+    return hashlib.sha1(key.encode()).hexdigest()[:12]
+
+
+class ErrorReport:
+
+    __slots__ = ('fingerprint', 'error', 'command', 'content', 'info', 'author', 'avatar_url', 'colour', 'count')
+
+    def __init__(self, *, ctx: context.Context, error: BaseException, fingerprint: str, time: str) -> None:
+
+        self.fingerprint = fingerprint
+        self.error = error
+
+        self.command = str(ctx.command)
+        self.content = ctx.message.content
+
+        self.info = f'{f"`Guild:` {ctx.guild} `{ctx.guild.id}`" if ctx.guild else ""}\n' \
+                    f'`Channel:` {ctx.channel} `{ctx.channel.id}`\n' \
+                    f'`Author:` {ctx.author} `{ctx.author.id}`\n' \
+                    f'`Time:` {time}'
+
+        self.author = str(ctx.author)
+        self.avatar_url = str(ctx.author.avatar_url_as(format='gif' if ctx.author.is_avatar_animated() else 'png'))
+        self.colour = ctx.colour
+
+        self.count = 1
+
+    def __repr__(self) -> str:
+        return f'<ErrorReport fingerprint={self.fingerprint} command={self.command} count={self.count}>'
+
+    @property
+    def name(self) -> str:
+        return type(self.error).__name__
+
+
+class ErrorReporter:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        self.formatter = prettify_exceptions.DefaultFormatter()
+        self.formatter.theme = {**self.formatter.theme, '_ansi_enabled': False}
+
+        self.console_formatter = prettify_exceptions.DefaultFormatter()
+        self.console_formatter.theme = {**self.console_formatter.theme, '_ansi_enabled': True}
+
+        self.pending: typing.Dict[str, ErrorReport] = {}
+        self.recent = cache.TTLCache(max_size=1000, ttl=self.bot.config.errors['dedupe_window'])
+        self.dropped = 0
+
+        self.task = self.bot.loop.create_task(self.worker())
+
+    def close(self) -> None:
+        self.task.cancel()
+
+    def report(self, *, ctx: context.Context, error: BaseException) -> None:
+
+        key = fingerprint(error)
+
+        if (report := self.pending.get(key)) is not None:
+            report.count += 1
+            return
+
+        if len(self.pending) >= self.bot.config.errors['max_pending']:
+            self.dropped += 1
+            return
+
+        self.pending[key] = ErrorReport(ctx=ctx, error=error, fingerprint=key, time=self.bot.utils.format_datetime(datetime=pendulum.now(tz='UTC')))
+
+    #
+
+    def format(self, report: ErrorReport) -> typing.Tuple[str, str]:
+
+        error = report.error
+
+        console = ''.join(self.console_formatter.format_exception(type(error), error, error.__traceback__)).strip()
+        plain = ''.join(self.formatter.format_exception(type(error), error, error.__traceback__)).strip()
+
+        return console, plain
+
+    async def worker(self) -> None:
+
+        while True:
+
+            await asyncio.sleep(self.bot.config.errors['batch_interval'])
+
+            if not self.pending and not self.dropped:
+                continue
+
+            reports = list(self.pending.values())
+            dropped = self.dropped
+
+            self.pending = {}
+            self.dropped = 0
+
+            try:
+                await self.flush(reports=reports, dropped=dropped)
+            except Exception as error:
+                log.warning(f'[ERRORS] Error while flushing error reports | {error!r}')
+                print(f'[ERRORS] Error while flushing error reports | {error!r}')
+
+    async def send(self, **kwargs) -> None:
+
+        try:
+            await self.bot.errors_webhook.send(**kwargs)
+        except discord.HTTPException as error:
+            log.warning(f'[ERRORS] Error while sending error report to webhook | {error!r}')
+
+        await asyncio.sleep(self.bot.config.errors['send_delay'])
+
+    async def send_report(self, *, report: ErrorReport) -> None:
+
+        console, plain = await self.bot.loop.run_in_executor(None, self.format, report)
+
+        print(f'\n{console}\n')
+        log.error(f'[COMMANDS]\n\n{plain}\n\n')
+
+        embed = discord.Embed(colour=report.colour, description=f'{report.content}')
+        embed.add_field(name='Info:', value=f'Error in command `{report.command}`{f" (x{report.count})" if report.count > 1 else ""}\n\n{report.info}')
+        embed.set_footer(text=f'Fingerprint: {report.fingerprint}')
+
+        await self.send(embed=embed, username=report.author, avatar_url=report.avatar_url)
+
+        if len(plain) < 2000:
+            plain = f'```py\n{plain}\n```'
+
+        else:
+            try:
+                plain = await self.bot.mystbin.post(plain, syntax='python')
+            except mystbin.APIError as error:
+                log.warning(f'[ERRORS] Error while uploading error traceback to mystbin | Code: {error.status_code} | Message: {error.message}')
+                print(f'[ERRORS] Error while uploading error traceback to mystbin | Code: {error.status_code} | Message: {error.message}')
+                plain = f'```py\n{plain[:1950]}\n```'
+
+        await self.send(content=f'{plain}', username=report.author, avatar_url=report.avatar_url)
+
+    async def flush(self, *, reports: typing.List[ErrorReport], dropped: int) -> None:
+
+        new = [report for report in reports if report.fingerprint not in self.recent]
+        repeated = [report for report in reports if report.fingerprint in self.recent]
+
+        for report in new:
+
+            self.recent.put(report.fingerprint, True)
+
+            try:
+                await self.send_report(report=report)
+            except Exception as error:
+                log.warning(f'[ERRORS] Error while sending error report \'{report.fingerprint}\' | {error!r}')
+                print(f'[ERRORS] Error while sending error report \'{report.fingerprint}\' | {error!r}')
+
+        for report in repeated:
+            log.error(f'[COMMANDS] Repeated error \'{report.fingerprint}\' | {report.name} in command \'{report.command}\' | Count: {report.count}')
+            print(f'[COMMANDS] Repeated error \'{report.fingerprint}\' | {report.name} in command \'{report.command}\' | Count: {report.count}')
+
+        if dropped:
+            log.error(f'[COMMANDS] Dropped {dropped} error report(s) because too many were pending.')
+            print(f'[COMMANDS] Dropped {dropped} error report(s) because too many were pending.')
+
+        if not repeated and not dropped:
+            return
+
+        description = '\n'.join(f'`{report.fingerprint}` **{report.name}** in `{report.command}` x{report.count}' for report in repeated)
+        if dropped:
+            description += f'\n\n`{dropped}` error(s) were dropped because too many were pending.'
+
+        embed = discord.Embed(colour=discord.Colour.red(), title='Repeated errors', description=description[:2048])
+        await self.send(embed=embed, username='Errors')
@@ -10,21 +10,31 @@
 #  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
 #
 
+from __future__ import annotations
+
+import asyncio
+import contextlib
+import functools
+import heapq
 import io
+import itertools
 import multiprocessing
 import typing
+from typing import TYPE_CHECKING
 
-import aiohttp
 import discord
+from PIL import Image as PILImage
 from wand.color import Color
 from wand.exceptions import MissingDelegateError
 from wand.image import Image
 from wand.sequence import SingleImage
 
-from bot import Life
-from utilities import context
+from utilities import context, media
 from utilities.exceptions import ArgumentError, ImageError
 
+if TYPE_CHECKING:
+    from bot import Life
+
 
 def edge(image: typing.Union[Image, SingleImage], radius: float, sigma: float):
 
@@ -179,6 +189,30 @@ image_operations = {
     'floor': floor
 }
 
+# Rough relative cpu cost of each operation per megapixel-frame, used to weigh image requests against each other.
+operation_costs = {
+    'blur': 1.0,
+    'edge': 1.5,
+    'emboss': 1.2,
+    'kuwahara': 6.0,
+    'sharpen': 4.0,
+    'spread': 0.5,
+    'noise': 0.6,
+    'blueshift': 0.2,
+    'charcoal': 2.0,
+    'colorize': 0.3,
+    'implode': 0.6,
+    'polaroid': 1.5,
+    'sepiatone': 0.3,
+    'solarize': 0.2,
+    'swirl': 0.5,
+    'wave': 0.5,
+    'flip': 0.05,
+    'flop': 0.05,
+    'rotate': 0.3,
+    'floor': 1.0
+}
+
 
 def do_edit_image(edit_function: typing.Any, image_bytes: bytes, child_pipe: multiprocessing.Pipe, **kwargs):
 
@@ -217,30 +251,130 @@ def do_edit_image(edit_function: typing.Any, image_bytes: bytes, child_pipe: mul
         child_pipe.send(ImageError())
 
 
-class Imaging:
+def estimate_cost(edit_type: str, image_bytes: bytes) -> float:
+
+    try:
+        with PILImage.open(io.BytesIO(image_bytes)) as image:
+            megapixel_frames = (image.width * image.height * getattr(image, 'n_frames', 1)) / 1_000_000
+    except (PILImage.UnidentifiedImageError, OSError):
+        megapixel_frames = 1
+
+    return megapixel_frames * operation_costs[edit_type]
+
+
+class ImagingJob:
+
+    __slots__ = ('guild_id', 'cost', 'tag', 'function', 'future', 'started')
+
+    def __init__(self, *, guild_id: int, cost: float, tag: float, function: typing.Callable[[], typing.Awaitable], future: asyncio.Future) -> None:
+
+        self.guild_id = guild_id
+        self.cost = cost
+        self.tag = tag
+        self.function = function
+        self.future = future
+
+        self.started = False
+
+    def __repr__(self) -> str:
+        return f'<ImagingJob guild_id={self.guild_id} cost={self.cost} started={self.started}>'
+
+
+class ImagingScheduler:
 
     def __init__(self, bot: Life) -> None:
         self.bot = bot
 
-    async def edit_image(self, ctx: context.Context, edit_type: str,  url: str = None, **kwargs) -> discord.Embed:
+        self.workers = self.bot.config.imaging['workers']
+        self.expensive_workers = max(self.workers - self.bot.config.imaging['reserved_workers'], 1)
+        self.cheap_cost = self.bot.config.imaging['cheap_cost']
 
-        if ctx.message.attachments:
-            url = ctx.message.attachments[0].url
+        self.queue = []
+        self.sequence = itertools.count()
 
-        if url is None:
-            url = str(ctx.author.avatar_url_as(format='gif' if ctx.author.is_avatar_animated() is True else 'png'))
+        self.guild_tags = {}
+        self.virtual_time = 0.0
+
+        self.running = 0
+        self.running_expensive = 0
+
+    def submit(self, *, guild_id: int, cost: float, function: typing.Callable[[], typing.Awaitable]) -> ImagingJob:
+
+        # Start-time fair queuing, each guild's jobs are tagged after its previous job so that one busy guild can not starve the others, and cheap jobs get
+        # earlier tags than expensive ones submitted at the same time.
+        tag = max(self.virtual_time, self.guild_tags.get(guild_id, 0.0)) + cost
+        self.guild_tags[guild_id] = tag
+
+        job = ImagingJob(guild_id=guild_id, cost=cost, tag=tag, function=function, future=self.bot.loop.create_future())
+        heapq.heappush(self.queue, (job.tag, next(self.sequence), job))
+
+        self.dispatch()
+        return job
+
+    def position(self, job: ImagingJob) -> int:
+        return sum(1 for tag, _, queued in self.queue if tag < job.tag and not queued.future.done()) + 1
+
+    def dispatch(self) -> None:
+
+        deferred = []
+
+        while self.queue and self.running < self.workers:
+
+            tag, sequence, job = heapq.heappop(self.queue)
+            if job.future.done():
+                continue
+
+            if job.cost > self.cheap_cost and self.running_expensive >= self.expensive_workers:
+                deferred.append((tag, sequence, job))
+                continue
+
+            self.start(job=job)
+
+        for item in deferred:
+            heapq.heappush(self.queue, item)
+
+    def start(self, *, job: ImagingJob) -> None:
+
+        job.started = True
+        self.virtual_time = max(self.virtual_time, job.tag - job.cost)
+
+        self.running += 1
+        if job.cost > self.cheap_cost:
+            self.running_expensive += 1
+
+        self.bot.loop.create_task(self.execute(job=job))
+
+    async def execute(self, *, job: ImagingJob) -> None:
 
         try:
-            async with self.bot.session.get(url) as response:
-                image_bytes = await response.read()
-        except Exception:
-            raise ArgumentError(f'Something went wrong while trying to download that image. Check the URL.')
+            result = await job.function()
+        except Exception as error:
+            if not job.future.done():
+                job.future.set_exception(error)
         else:
-            if response.headers.get('Content-Type') not in ['image/png', 'image/gif', 'image/jpeg', 'image/webp']:
-                raise ImageError('That file format is not allowed, only png, gif, jpg and webp are allowed.')
+            if not job.future.done():
+                job.future.set_result(result)
+        finally:
+
+            self.running -= 1
+            if job.cost > self.cheap_cost:
+                self.running_expensive -= 1
+
+            if self.guild_tags.get(job.guild_id, 0.0) <= self.virtual_time:
+                self.guild_tags.pop(job.guild_id, None)
+
+            self.dispatch()
 
-            if response.headers.get('Content-Length') and int(response.headers.get('Content-Length')) > 15728640:
-                raise ImageError('That file is over 15mb.')
+
+class Imaging:
+
+    def __init__(self, bot: Life) -> None:
+        self.bot = bot
+
+        self.uploader = media.MediaUploader(bot=self.bot)
+        self.scheduler = ImagingScheduler(bot=self.bot)
+
+    async def process_image(self, edit_type: str, image_bytes: bytes, **kwargs) -> dict:
 
         parent_pipe, child_pipe = multiprocessing.Pipe()
         args = (image_operations[edit_type], image_bytes, child_pipe)
@@ -256,17 +390,50 @@ class Imaging:
         process.join()
         process.close()
 
-        form_data = aiohttp.FormData()
-        form_data.add_field('file', data['image'], filename=f'image.{data["format"].lower()}')
+        return data
+
+    async def edit_image(self, ctx: context.Context, edit_type: str,  url: str = None, **kwargs) -> typing.Tuple[discord.Embed, typing.Optional[discord.File]]:
 
-        async with self.bot.session.post('https://media.mrrandom.xyz/api/media', headers={"Authorization": self.bot.config.axelweb_token}, data=form_data) as response:
+        if ctx.message.attachments:
+            url = ctx.message.attachments[0].url
+
+        if url is None:
+            url = str(ctx.author.avatar_url_as(format='gif' if ctx.author.is_avatar_animated() is True else 'png'))
+
+        try:
+            async with self.bot.session.get(url) as response:
+                image_bytes = await response.read()
+        except Exception:
+            raise ArgumentError(f'Something went wrong while trying to download that image. Check the URL.')
+        else:
+            if response.headers.get('Content-Type') not in ['image/png', 'image/gif', 'image/jpeg', 'image/webp']:
+                raise ImageError('That file format is not allowed, only png, gif, jpg and webp are allowed.')
+
+            if response.headers.get('Content-Length') and int(response.headers.get('Content-Length')) > 15728640:
+                raise ImageError('That file is over 15mb.')
+
+        cost = await self.bot.loop.run_in_executor(None, estimate_cost, edit_type, image_bytes)
+        job = self.scheduler.submit(guild_id=ctx.guild.id if ctx.guild else ctx.author.id, cost=cost,
+                                    function=functools.partial(self.process_image, edit_type, image_bytes, **kwargs))
+
+        message = None
+        if not job.started:
+            message = await ctx.send(f'Your image is queued at position `{self.scheduler.position(job)}`, it will be processed shortly.')
+
+        try:
+            data = await job.future
+        finally:
+            if message:
+                with contextlib.suppress(discord.HTTPException):
+                    await message.delete()
 
-            if response.status == 413:
-                raise ImageError('The image produced was over 100mb.')
+        image_bytes = data['image'].getvalue()
+        data['image'].close()
 
-            post = await response.json()
+        attachment_limit = ctx.guild.filesize_limit if ctx.guild else 8388608
+        result = await self.uploader.upload(data=image_bytes, filename=f'image.{data["format"].lower()}', attachment_limit=attachment_limit)
 
         embed = discord.Embed(colour=ctx.colour)
         embed.set_footer(text=data['text'])
-        embed.set_image(url=f'https://media.mrrandom.xyz/{post.get("filename")}')
-        return embed
+        embed.set_image(url=result.url)
+        return embed, result.file
@@ -0,0 +1,334 @@
+#  Life
+#  Copyright (C) 2020 Axel#3456
+#
+#  Life is free software: you can redistribute it and/or modify it under the terms of the GNU Affero General Public License as published by the Free Software
+#  Foundation, either version 3 of the License, or (at your option) any later version.
+#
+#  Life is distributed in the hope that it will be useful, but WITHOUT ANY WARRANTY; without even the implied warranty of MERCHANTABILITY or FITNESS FOR A
+#  PARTICULAR PURPOSE.  See the GNU Affero General Public License for more details.
+#
+#  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
+#
+
+import asyncio
+import io
+import logging
+import os
+import time
+import typing
+import uuid
+
+import aiohttp
+import aiohttp.web
+import discord
+from discord.ext import tasks
+
+from utilities.exceptions import ImageError
+
+log = logging.getLogger(__name__)
+
+
+class MediaResult:
+
+    __slots__ = ('url', 'file', 'backend')
+
+    def __init__(self, *, url: str, backend: str, file: discord.File = None) -> None:
+
+        self.url = url
+        self.backend = backend
+        self.file = file
+
+    def __repr__(self) -> str:
+        return f'<MediaResult url=\'{self.url}\' backend=\'{self.backend}\'>'
+
+
+class MediaMetrics:
+
+    __slots__ = ('uploads', 'failures', 'retries', 'bytes', 'total_time', 'max_time')
+
+    def __init__(self) -> None:
+
+        self.uploads = 0
+        self.failures = 0
+        self.retries = 0
+        self.bytes = 0
+
+        self.total_time = 0.0
+        self.max_time = 0.0
+
+    def __repr__(self) -> str:
+        return f'<MediaMetrics uploads={self.uploads} failures={self.failures} average_time={self.average_time}>'
+
+    @property
+    def average_time(self) -> float:
+        return self.total_time / self.uploads if self.uploads else 0.0
+
+    def record(self, *, size: int, elapsed: float) -> None:
+
+        self.uploads += 1
+        self.bytes += size
+        self.total_time += elapsed
+        self.max_time = max(self.max_time, elapsed)
+
+
+class MediaBackend:
+
+    name = None
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+    async def start(self) -> None:
+        pass
+
+    async def close(self) -> None:
+        pass
+
+    async def upload(self, *, data: bytes, filename: str) -> MediaResult:
+        raise NotImplementedError
+
+
+class AttachmentBackend(MediaBackend):
+
+    name = 'attachment'
+
+    async def upload(self, *, data: bytes, filename: str) -> MediaResult:
+        return MediaResult(url=f'attachment://{filename}', backend=self.name, file=discord.File(fp=io.BytesIO(data), filename=filename))
+
+
+class LocalBackend(MediaBackend):
+
+    name = 'local'
+
+    def __init__(self, bot) -> None:
+        super().__init__(bot)
+
+        self.path = os.path.abspath(self.bot.config.media['path'])
+        self.url = self.bot.config.media['url'].rstrip('/')
+
+        self.runner = None
+
+        self.size = 0
+        self.prune_lock = asyncio.Lock()
+
+        if not self.url:
+            raise ValueError('The local media backend requires media[\'url\'] to be set to the public url the media directory is served from.')
+
+        self.prune_media.change_interval(seconds=self.bot.config.media['prune_interval'])
+
+    async def start(self) -> None:
+
+        os.makedirs(self.path, exist_ok=True)
+
+        if not self.prune_media.is_running():
+            self.prune_media.start()
+
+        if not self.bot.config.media['serve'] or self.runner is not None:
+            return
+
+        app = aiohttp.web.Application()
+        app.router.add_static('/', self.path)
+
+        self.runner = aiohttp.web.AppRunner(app)
+        await self.runner.setup()
+
+        site = aiohttp.web.TCPSite(self.runner, host=self.bot.config.media['host'], port=self.bot.config.media['port'])
+        await site.start()
+
+        log.info(f'[MEDIA] Serving local media from \'{self.path}\' on {self.bot.config.media["host"]}:{self.bot.config.media["port"]}.')
+
+    async def close(self) -> None:
+
+        self.prune_media.cancel()
+
+        if self.runner is None:
+            return
+
+        await self.runner.cleanup()
+        self.runner = None
+
+    @staticmethod
+    def write(path: str, data: bytes) -> None:
+
+        with open(path, 'wb') as file:
+            file.write(data)
+
+    def prune(self) -> typing.Tuple[int, int]:
+
+        now = time.time()
+        ttl = self.bot.config.media['ttl']
+
+        files = []
+        removed = 0
+
+        for entry in os.scandir(self.path):
+
+            if not entry.is_file():
+                continue
+
+            stat = entry.stat()
+
+            if now - stat.st_mtime <= ttl:
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+                continue
+
+            try:
+                os.remove(entry.path)
+            except FileNotFoundError:
+                pass
+            removed += 1
+
+        size = sum(file_size for _, file_size, _ in files)
+
+        for _, file_size, path in sorted(files):
+
+            if size <= self.bot.config.media['max_bytes']:
+                break
+
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            size -= file_size
+            removed += 1
+
+        return removed, size
+
+    async def prune_files(self) -> None:
+
+        async with self.prune_lock:
+
+            try:
+                removed, self.size = await self.bot.loop.run_in_executor(None, self.prune)
+            except OSError as error:
+                log.warning(f'[MEDIA] Error while pruning local media | {error!r}')
+                return
+
+        if removed:
+            log.info(f'[MEDIA] Pruned local media. [{removed} files removed | {self.size} bytes kept]')
+
+    @tasks.loop(seconds=600)
+    async def prune_media(self) -> None:
+        await self.prune_files()
+
+    async def upload(self, *, data: bytes, filename: str) -> MediaResult:
+
+        filename = f'{uuid.uuid4().hex}{os.path.splitext(filename)[1]}'
+        await self.bot.loop.run_in_executor(None, self.write, os.path.join(self.path, filename), data)
+
+        self.size += len(data)
+        if self.size > self.bot.config.media['max_bytes'] and not self.prune_lock.locked():
+            self.bot.loop.create_task(self.prune_files())
+
+        return MediaResult(url=f'{self.url}/{filename}', backend=self.name)
+
+
+class RemoteBackend(MediaBackend):
+
+    name = 'remote'
+
+    async def upload(self, *, data: bytes, filename: str) -> MediaResult:
+
+        form_data = aiohttp.FormData()
+        form_data.add_field('file', io.BytesIO(data), filename=filename)
+
+        async with self.bot.session.post('https://media.mrrandom.xyz/api/media', headers={'Authorization': self.bot.config.axelweb_token}, data=form_data,
+                                         timeout=aiohttp.ClientTimeout(total=self.bot.config.media['timeout'])) as response:
+
+            if response.status == 413:
+                raise ImageError('The image produced was over 100mb.')
+
+            response.raise_for_status()
+            post = await response.json()
+
+        return MediaResult(url=f'https://media.mrrandom.xyz/{post.get("filename")}', backend=self.name)
+
+
+class MediaUploader:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        backends = {backend.name: backend for backend in (LocalBackend, RemoteBackend)}
+
+        self.backends = {backend.name: backend(bot=self.bot) for backend in (AttachmentBackend, backends[self.bot.config.media['backend']])}
+        self.backend = self.backends[self.bot.config.media['backend']]
+
+        self.metrics = {name: MediaMetrics() for name in self.backends.keys()}
+
+        self.queue = asyncio.Queue()
+        self.workers = []
+
+    async def start(self) -> None:
+
+        if self.workers:
+            return
+
+        self.workers = [self.bot.loop.create_task(self.worker()) for _ in range(self.bot.config.media['concurrency'])]
+        await self.backend.start()
+
+    async def close(self) -> None:
+
+        for worker in self.workers:
+            worker.cancel()
+        self.workers = []
+
+        await self.backend.close()
+
+    async def worker(self) -> None:
+
+        while True:
+
+            data, filename, future = await self.queue.get()
+
+            try:
+                result = await self.do_upload(backend=self.backend, data=data, filename=filename)
+            except Exception as error:
+                if not future.done():
+                    future.set_exception(error)
+            else:
+                if not future.done():
+                    future.set_result(result)
+            finally:
+                self.queue.task_done()
+
+    async def do_upload(self, *, backend: MediaBackend, data: bytes, filename: str) -> MediaResult:
+
+        metrics = self.metrics[backend.name]
+        retries = self.bot.config.media['retries']
+
+        for attempt in range(retries + 1):
+
+            start = time.perf_counter()
+
+            try:
+                result = await backend.upload(data=data, filename=filename)
+            except (aiohttp.ClientError, asyncio.TimeoutError, OSError) as error:
+
+                metrics.failures += 1
+                log.warning(f'[MEDIA] Upload to backend \'{backend.name}\' failed. Attempt: {attempt + 1}/{retries + 1} | Error: {error!r}')
+
+                if attempt >= retries:
+                    raise ImageError('Something went wrong while trying to upload that image.')
+
+                metrics.retries += 1
+                await asyncio.sleep(2 ** attempt)
+
+            else:
+                metrics.record(size=len(data), elapsed=time.perf_counter() - start)
+                return result
+
+    async def upload(self, *, data: bytes, filename: str, attachment_limit: int = 0) -> MediaResult:
+
+        if len(data) <= min(attachment_limit, self.bot.config.media['attachment_limit']):
+            return await self.do_upload(backend=self.backends['attachment'], data=data, filename=filename)
+
+        await self.start()
+
+        future = self.bot.loop.create_future()
+        await self.queue.put((data, filename, future))
+
+        return await future
+
+    def stats(self) -> typing.Dict[str, MediaMetrics]:
+        return {name: metrics for name, metrics in self.metrics.items() if metrics.uploads or metrics.failures}
@@ -59,7 +59,7 @@ class GuildConfig:
 class DefaultUserConfig:
 
     __slots__ = ('colour', 'blacklisted', 'blacklisted_reason', 'timezone', 'timezone_private', 'coins', 'xp', 'level_up_notifications', 'daily_collected', 'weekly_collected',
-                 'monthly_collected', 'daily_streak', 'weekly_streak', 'monthly_streak', 'created_at', 'birthday', 'birthday_private', 'reminders', 'requires_db_update')
+                 'monthly_collected', 'daily_streak', 'weekly_streak', 'monthly_streak', 'created_at', 'birthday', 'birthday_private', 'requires_db_update')
 
     def __init__(self) -> None:
 
@@ -89,7 +89,6 @@ class DefaultUserConfig:
         self.birthday = pendulum.DateTime(2020, 1, 1, 0, 0, 0, tzinfo=pendulum.timezone('UTC'))
         self.birthday_private = False
 
-        self.reminders = []
         self.requires_db_update = []
 
     def __repr__(self) -> str:
@@ -119,7 +118,7 @@ class DefaultUserConfig:
 class UserConfig:
 
     __slots__ = ('colour', 'blacklisted', 'blacklisted_reason', 'timezone', 'timezone_private', 'coins', 'xp', 'level_up_notifications', 'daily_collected', 'weekly_collected',
-                 'monthly_collected', 'daily_streak', 'weekly_streak', 'monthly_streak', 'created_at', 'birthday', 'birthday_private', 'reminders', 'requires_db_update')
+                 'monthly_collected', 'daily_streak', 'weekly_streak', 'monthly_streak', 'created_at', 'birthday', 'birthday_private', 'requires_db_update')
 
     def __init__(self, data: dict) -> None:
 
@@ -149,7 +148,6 @@ class UserConfig:
         self.birthday = pendulum.parse(data.get('birthday').isoformat(), tz='UTC')
         self.birthday_private = data.get('birthday_private')
 
-        self.reminders = []
         self.requires_db_update = []
 
     def __repr__(self) -> str:
@@ -178,7 +176,7 @@ class UserConfig:
 
 class Reminder:
 
-    __slots__ = ('user_id', 'channel_id', 'message_id', 'id', 'datetime', 'created_at', 'content', 'link', 'dm', 'task')
+    __slots__ = ('user_id', 'channel_id', 'message_id', 'id', 'datetime', 'created_at', 'content', 'link', 'dm')
 
     def __init__(self, data: dict) -> None:
 
@@ -192,8 +190,6 @@ class Reminder:
         self.link = data.get('link')
         self.dm = data.get('dm')
 
-        self.task = None
-
     def __repr__(self) -> str:
         return f'<Reminder user_id={self.user_id} id={self.id} datetime={self.datetime} done={self.done}>'
 
@@ -10,10 +10,142 @@
 #  You should have received a copy of the GNU Affero General Public License along with Life. If not, see https://www.gnu.org/licenses/.
 #
 
+from __future__ import annotations
+
 import asyncio
+import collections.abc
+import inspect
+import math
+from typing import Any, AsyncIterable, Awaitable, Callable, Dict, Iterable, List, Optional, Union
 
 import discord
 
+from utilities import cache
+
+
+class PaginatorRegistry:
+
+    def __init__(self, bot) -> None:
+        self.bot = bot
+
+        self.paginators: Dict[int, BasePaginator] = {}
+
+        self.bot.add_listener(self.on_raw_reaction, 'on_raw_reaction_add')
+        self.bot.add_listener(self.on_raw_reaction, 'on_raw_reaction_remove')
+
+    def __len__(self) -> int:
+        return len(self.paginators)
+
+    def register(self, paginator: BasePaginator) -> None:
+        self.paginators[paginator.message.id] = paginator
+
+    def unregister(self, paginator: BasePaginator) -> None:
+
+        if paginator.message is not None and self.paginators.get(paginator.message.id) is paginator:
+            del self.paginators[paginator.message.id]
+
+    async def on_raw_reaction(self, payload: discord.RawReactionActionEvent) -> None:
+
+        if (paginator := self.paginators.get(payload.message_id)) is None or not paginator.check_reaction(payload):
+            return
+
+        paginator.reactions.put_nowait(str(payload.emoji).strip('<>'))
+
+
+class PageSource:
+
+    def __init__(self, *, entries: Union[Iterable[Any], AsyncIterable[Any]] = None, page_fetcher: Callable[[int], Union[List[Any], Awaitable[List[Any]]]] = None,
+                 total_entries: int = None, per_page: int = 1) -> None:
+
+        self.per_page = per_page
+        self.page_fetcher = page_fetcher
+        self.total_entries = total_entries
+
+        self.sequence = None
+        self.iterator = None
+        self.buffer = []
+        self.probed: Dict[int, List[Any]] = {}
+
+        if isinstance(entries, collections.abc.Sequence):
+            self.sequence = entries
+            self.total_entries = len(entries)
+        elif isinstance(entries, collections.abc.AsyncIterable):
+            self.iterator = entries.__aiter__()
+        elif entries is not None:
+            self.iterator = iter(entries)
+
+    @property
+    def page_count(self) -> Optional[int]:
+
+        if self.total_entries is None:
+            return None
+
+        return max(math.ceil(self.total_entries / self.per_page), 1)
+
+    async def fill(self, count: Optional[int] = None) -> None:
+
+        while self.iterator is not None and (count is None or len(self.buffer) < count):
+
+            try:
+                if isinstance(self.iterator, collections.abc.AsyncIterator):
+                    entry = await self.iterator.__anext__()
+                else:
+                    entry = next(self.iterator)
+
+            except (StopIteration, StopAsyncIteration):
+                self.iterator = None
+                self.total_entries = len(self.buffer)
+                break
+
+            self.buffer.append(entry)
+
+    async def get_page(self, page: int) -> List[Any]:
+
+        start = page * self.per_page
+
+        if self.sequence is not None:
+            return list(self.sequence[start:start + self.per_page])
+
+        if self.page_fetcher is not None:
+
+            if (entries := self.probed.pop(page, None)) is not None:
+                return entries
+
+            entries = self.page_fetcher(page)
+            if inspect.isawaitable(entries):
+                entries = await entries
+
+            return list(entries)
+
+        await self.fill(start + self.per_page)
+        return self.buffer[start:start + self.per_page]
+
+    async def has_page(self, page: int) -> bool:
+
+        if page < 0:
+            return False
+
+        if self.page_count is not None:
+            return page < self.page_count
+
+        if self.page_fetcher is not None:
+
+            if not (entries := await self.get_page(page)):
+                return False
+
+            self.probed[page] = entries
+            return True
+
+        await self.fill(page * self.per_page + 1)
+        return len(self.buffer) > page * self.per_page
+
+    async def last_page(self) -> Optional[int]:
+
+        if self.page_count is None and self.iterator is not None:
+            await self.fill()
+
+        return None if self.page_count is None else self.page_count - 1
+
 
 class BasePaginator:
 
@@ -22,8 +154,7 @@ class BasePaginator:
         self.kwargs = kwargs
 
         self.ctx = kwargs.get('ctx')
-        self.entries = [str(entry) for entry in kwargs.get('entries')]
-        self.per_page = kwargs.get('per_page')
+        self.per_page = kwargs.get('per_page', 1)
 
         self.delete_when_done = kwargs.get('delete_when_done', True)
         self.bot = kwargs.get('bot', self.ctx.bot)
@@ -33,13 +164,17 @@ class BasePaginator:
         self.codeblock_start = '```\n' if self.codeblock else ''
         self.codeblock_end = '\n```' if self.codeblock else ''
 
-        self.pages = ['\n'.join(self.entries[page:page + self.per_page]) for page in range(0, len(self.entries), self.per_page)]
+        self.source = PageSource(entries=kwargs.get('entries'), page_fetcher=kwargs.get('page_fetcher'), total_entries=kwargs.get('total_entries'), per_page=self.per_page)
+        self.page_cache = cache.TTLCache(max_size=kwargs.get('cache_size', 10))
 
         self.task_loop = None
+        self.task_react = None
         self.message = None
         self.looping = True
         self.page = 0
 
+        self.reactions = asyncio.Queue()
+
         self.buttons = {
             ':first:737826967910481931': self.first,
             ':backward:737826960885153800': self.backward,
@@ -48,6 +183,14 @@ class BasePaginator:
             ':last:737826943520473198': self.last
         }
 
+    @property
+    def page_count(self) -> str:
+        return str(self.source.page_count or '?')
+
+    @property
+    def total_entries(self) -> str:
+        return str(self.source.total_entries if self.source.total_entries is not None else '?')
+
     def check_reaction(self, payload: discord.RawReactionActionEvent) -> bool:
 
         if self.message is None:
@@ -61,114 +204,141 @@ class BasePaginator:
 
         return str(payload.emoji).strip('<>') in self.buttons.keys()
 
+    @property
+    def needed_buttons(self) -> List[str]:
+
+        page_count = self.source.page_count
+
+        if page_count == 1:
+            return [':stop:737826951980646491']
+        if page_count is not None and page_count < 5:
+            return [emote for emote in self.buttons.keys() if emote not in (':first:737826967910481931', ':last:737826943520473198')]
+
+        return list(self.buttons.keys())
+
     async def react(self) -> None:
 
-        if len(self.pages) == 1:
-            await self.message.add_reaction(':stop:737826951980646491')
-        else:
-            for emote in self.buttons.keys():
-                if emote in (':start:737826967910481931', ':end:737826943520473198') and len(self.pages) < 5:
-                    continue
+        for emote in self.needed_buttons:
+            try:
                 await self.message.add_reaction(emote)
+            except discord.HTTPException:
+                break
 
-    async def loop(self) -> None:
+    async def remove_reactions(self) -> None:
 
-        await self.react()
+        try:
+            await self.message.clear_reactions()
+        except discord.Forbidden:
+            for emote in self.needed_buttons:
+                await self.message.remove_reaction(emote, self.bot.user)
 
-        while self.looping is True:
+    async def loop(self) -> None:
 
-            try:
-                tasks = [
-                    asyncio.ensure_future(self.bot.wait_for('raw_reaction_add', check=self.check_reaction)),
-                    asyncio.ensure_future(self.bot.wait_for('raw_reaction_remove', check=self.check_reaction))
-                ]
-                done, pending = await asyncio.wait(tasks, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
+        self.task_react = asyncio.create_task(self.react())
 
-                for task in pending:
-                    task.cancel()
+        try:
+            while self.looping is True:
 
-                if len(done) == 0:
-                    raise asyncio.TimeoutError()
+                try:
+                    button = await asyncio.wait_for(self.reactions.get(), timeout=self.timeout)
+                except asyncio.TimeoutError:
+                    self.looping = False
+                    continue
 
-                await self.buttons[str(done.pop().result().emoji).strip('<>')]()
+                await self.buttons[button]()
 
-            except asyncio.TimeoutError:
-                self.looping = False
+        finally:
+            self.bot.paginators.unregister(self)
+            self.task_react.cancel()
 
         if not self.message:
             return
 
         if self.delete_when_done is False:
-            for reaction in self.buttons.keys():
-                await self.message.remove_reaction(reaction, self.bot.user)
+            await self.remove_reactions()
 
         return await self.stop(delete=self.delete_when_done)
 
-    async def first(self) -> None:
-        pass
+    #
 
-    async def backward(self) -> None:
-        pass
+    async def render(self, entries: List[Any]) -> Any:
+        return '\n'.join(str(entry) for entry in entries)
 
-    async def stop(self, delete: bool = True) -> None:
-        pass
+    async def get_page(self, page: int) -> Any:
 
-    async def forward(self) -> None:
-        pass
+        if (rendered := self.page_cache.get(page)) is None:
+            rendered = await self.render(await self.source.get_page(page))
+            self.page_cache.put(page, rendered)
 
-    async def last(self) -> None:
-        pass
+        return rendered
 
+    async def send_page(self) -> discord.Message:
+        raise NotImplementedError
 
-class Paginator(BasePaginator):
+    async def edit_page(self) -> None:
+        raise NotImplementedError
 
-    def __init__(self, **kwargs) -> None:
-        super().__init__(**kwargs)
+    async def change_page(self, page: Optional[int]) -> None:
 
-        self.header = kwargs.get('header', '')
+        if page is None or page == self.page or not await self.source.has_page(page):
+            return
 
-    @property
-    def footer(self) -> str:
-        return self.kwargs.get('footer', f'\n\nPage: {self.page + 1}/{len(self.pages)} | Total entries: {len(self.entries)}')
+        self.page = page
+        await self.edit_page()
 
     async def paginate(self) -> None:
 
-        self.message = await self.ctx.send(f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}')
+        self.message = await self.send_page()
+
+        self.bot.paginators.register(self)
         self.task_loop = asyncio.create_task(self.loop())
 
     async def first(self) -> None:
-
-        self.page = 0
-        await self.message.edit(content=f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}')
+        await self.change_page(0)
 
     async def backward(self) -> None:
+        await self.change_page(self.page - 1)
 
-        if self.page <= 0:
-            return
+    async def stop(self, delete: bool = True) -> None:
 
-        self.page -= 1
-        await self.message.edit(content=f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}')
+        self.bot.paginators.unregister(self)
 
-    async def stop(self, delete: bool = True) -> None:
+        if self.task_loop is not asyncio.current_task():
+            self.task_loop.cancel()
+        if self.task_react:
+            self.task_react.cancel()
 
-        self.task_loop.cancel()
         self.looping = False
 
         if delete:
             self.message = await self.message.delete()
 
     async def forward(self) -> None:
+        await self.change_page(self.page + 1)
 
-        if self.page >= len(self.pages) - 1:
-            return
+    async def last(self) -> None:
+        await self.change_page(await self.source.last_page())
 
-        self.page += 1
-        await self.message.edit(content=f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}')
 
-    async def last(self) -> None:
+class Paginator(BasePaginator):
+
+    def __init__(self, **kwargs) -> None:
+        super().__init__(**kwargs)
+
+        self.header = kwargs.get('header', '')
+
+    @property
+    def footer(self) -> str:
+        return self.kwargs.get('footer', f'\n\nPage: {self.page + 1}/{self.page_count} | Total entries: {self.total_entries}')
 
-        self.page = len(self.pages) - 1
-        await self.message.edit(content=f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}')
+    async def content(self) -> str:
+        return f'{self.codeblock_start}{self.header}{await self.get_page(self.page)}{self.footer}{self.codeblock_end}'
+
+    async def send_page(self) -> discord.Message:
+        return await self.ctx.send(await self.content())
+
+    async def edit_page(self) -> None:
+        await self.message.edit(content=await self.content())
 
 
 class EmbedPaginator(BasePaginator):
@@ -187,7 +357,6 @@ class EmbedPaginator(BasePaginator):
         self.thumbnail = kwargs.get('thumbnail', None)
 
         self.embed = discord.Embed(colour=self.colour, title=self.title)
-        self.embed.set_footer(text=self.embed_footer)
 
         if self.image:
             self.embed.set_image(url=self.image)
@@ -199,178 +368,32 @@ class EmbedPaginator(BasePaginator):
     @property
     def embed_footer(self) -> str:
         additional_footer = f'| {self.kwargs.get("embed_add_footer")}' if self.kwargs.get('embed_add_footer') else ''
-        return self.kwargs.get('embed_footer', f'\n\nPage: {self.page + 1}/{len(self.pages)} | Total entries: {len(self.entries)} {additional_footer}')
-
-    async def paginate(self) -> None:
-
-        self.embed.description = f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}'
-        self.message = await self.ctx.send(embed=self.embed)
-
-        self.task_loop = asyncio.create_task(self.loop())
-
-    async def first(self) -> None:
-
-        self.page = 0
-
-        self.embed.description = f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}'
-        self.embed.set_footer(text=self.embed_footer)
-        await self.message.edit(embed=self.embed)
-
-    async def backward(self) -> None:
+        return self.kwargs.get('embed_footer', f'\n\nPage: {self.page + 1}/{self.page_count} | Total entries: {self.total_entries} {additional_footer}')
 
-        if self.page <= 0:
-            return
-        self.page -= 1
+    async def update_embed(self) -> discord.Embed:
 
-        self.embed.description = f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}'
+        self.embed.description = f'{self.codeblock_start}{self.header}{await self.get_page(self.page)}{self.footer}{self.codeblock_end}'
         self.embed.set_footer(text=self.embed_footer)
-        await self.message.edit(embed=self.embed)
 
-    async def stop(self, delete: bool = True) -> None:
+        return self.embed
 
-        self.task_loop.cancel()
-        self.looping = False
+    async def send_page(self) -> discord.Message:
+        return await self.ctx.send(embed=await self.update_embed())
 
-        if delete:
-            self.message = await self.message.delete()
+    async def edit_page(self) -> None:
+        await self.message.edit(embed=await self.update_embed())
 
-    async def forward(self) -> None:
 
-        if self.page >= len(self.pages) - 1:
-            return
-        self.page += 1
-
-        self.embed.description = f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}'
-        self.embed.set_footer(text=self.embed_footer)
-        await self.message.edit(embed=self.embed)
-
-    async def last(self) -> None:
-
-        self.page = len(self.pages) - 1
-
-        self.embed.description = f'{self.codeblock_start}{self.header}{self.pages[self.page]}{self.footer}{self.codeblock_end}'
-        self.embed.set_footer(text=self.embed_footer)
-        await self.message.edit(embed=self.embed)
-
-
-class EmbedsPaginator:
+class EmbedsPaginator(BasePaginator):
 
     def __init__(self, **kwargs) -> None:
+        super().__init__(**{**kwargs, 'per_page': 1})
 
-        self.kwargs = kwargs
-
-        self.ctx = kwargs.get('ctx')
-        self.entries = kwargs.get('entries')
-
-        self.delete_when_done = kwargs.get('delete_when_done', True)
-        self.bot = kwargs.get('bot', self.ctx.bot)
-        self.timeout = kwargs.get('timeout', 300)
-
-        self.task_loop = None
-        self.message = None
-        self.looping = True
-        self.page = 0
-
-        self.buttons = {
-            ':first:737826967910481931': self.first,
-            ':backward:737826960885153800': self.backward,
-            ':stop:737826951980646491': self.stop,
-            ':forward:737826943193448513': self.forward,
-            ':last:737826943520473198': self.last
-        }
-
-    def check_reaction(self, payload: discord.RawReactionActionEvent) -> bool:
-
-        if self.message is None:
-            return False
-
-        if payload.message_id != self.message.id:
-            return False
-
-        if payload.user_id not in (self.bot.owner_id, self.ctx.author.id):
-            return False
-
-        return str(payload.emoji).strip('<>') in self.buttons.keys()
-
-    async def react(self) -> None:
-
-        if len(self.entries) == 1:
-            await self.message.add_reaction(':stop:737826951980646491')
-        else:
-            for emote in self.buttons.keys():
-                if emote in (':start:737826967910481931', ':end:737826943520473198') and len(self.entries) < 5:
-                    continue
-                await self.message.add_reaction(emote)
-
-    async def loop(self) -> None:
-
-        await self.react()
-
-        while self.looping is True:
-
-            try:
-                tasks = [
-                    asyncio.ensure_future(self.bot.wait_for('raw_reaction_add', check=self.check_reaction)),
-                    asyncio.ensure_future(self.bot.wait_for('raw_reaction_remove', check=self.check_reaction))
-                ]
-                done, pending = await asyncio.wait(tasks, timeout=self.timeout, return_when=asyncio.FIRST_COMPLETED)
-
-                for task in pending:
-                    task.cancel()
-
-                if len(done) == 0:
-                    raise asyncio.TimeoutError()
-
-                await self.buttons[str(done.pop().result().emoji).strip('<>')]()
-
-            except asyncio.TimeoutError:
-                self.looping = False
-
-        if not self.message:
-            return
-
-        if self.delete_when_done is False:
-            for reaction in self.buttons.keys():
-                await self.message.remove_reaction(reaction, self.bot.user)
-
-        return await self.stop(delete=self.delete_when_done)
-
-    async def paginate(self) -> None:
-
-        self.message = await self.ctx.send(embed=self.entries[self.page])
-        self.task_loop = asyncio.create_task(self.loop())
-
-    async def first(self) -> None:
-
-        self.page = 0
-        await self.message.edit(embed=self.entries[self.page])
-
-    async def backward(self) -> None:
-
-        if self.page <= 0:
-            return
-        self.page -= 1
-
-        await self.message.edit(embed=self.entries[self.page])
-
-    async def stop(self, delete: bool = True) -> None:
-
-        self.task_loop.cancel()
-        self.looping = False
-
-        if delete:
-            self.message = await self.message.delete()
-
-    async def forward(self) -> None:
-
-        if self.page >= len(self.entries) - 1:
-            return
-        self.page += 1
-
-        await self.message.edit(embed=self.entries[self.page])
-
-    async def last(self) -> None:
+    async def render(self, entries: List[discord.Embed]) -> discord.Embed:
+        return entries[0]
 
-        self.page = len(self.entries) - 1
-        await self.message.edit(embed=self.entries[self.page])
+    async def send_page(self) -> discord.Message:
+        return await self.ctx.send(embed=await self.get_page(self.page))
 
+    async def edit_page(self) -> None:
+        await self.message.edit(embed=await self.get_page(self.page))